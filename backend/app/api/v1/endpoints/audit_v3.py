@@ -12,6 +12,7 @@ from app.services.audit.orchestrator_v3 import AuditOrchestratorV3
 from app.core.config import get_settings
 from app.api.v1.endpoints.me import get_current_user
 from app.models.user import User
+import asyncio
 import tempfile
 import shutil
 import logging
@@ -74,11 +75,10 @@ async def trigger_v3_audit(
         
         try:
             # Clone repo (reuse V2 logic)
-            from app.services.audit.scanner import AuditScanner
-            v2_scanner = AuditScanner()
+            from app.services.audit.scanner import audit_scanner
             
             repo_url = f"https://github.com/{owner}/{repo}"
-            await v2_scanner._clone_repo(repo_url, repo_doc.github_token or "", scan_dir)
+            await audit_scanner._clone_repo(repo_url, repo_doc.github_token or "", scan_dir)
             
             # Execute V3 audit
             audit_run = await orchestrator.execute(
@@ -93,7 +93,7 @@ async def trigger_v3_audit(
         finally:
             # Cleanup temp directory
             if scan_dir.exists():
-                shutil.rmtree(scan_dir)
+                await asyncio.to_thread(shutil.rmtree, scan_dir)
         
         return {
             "audit_run_id": str(audit_run.id),
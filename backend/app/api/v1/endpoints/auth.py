@@ -1,32 +1,31 @@
 from datetime import datetime
 from typing import Optional, List
 
-import httpx
 from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import RedirectResponse
 
 from app.core.config import get_settings
-from app.core.security import encrypt_token
+from app.core.security import encrypt_token, forget_decrypted_token
 from app.models.user import User
 from app.models.repo import Repo
+from app.services.github import github_service
 
 router = APIRouter(prefix="/auth/github", tags=["auth"])
 
 async def _exchange_code_for_token(code: str) -> str:
     settings = get_settings()
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            "https://github.com/login/oauth/access_token",
-            headers={"Accept": "application/json"},
-            data={
-                "client_id": settings.github_client_id,
-                "client_secret": settings.github_client_secret,
-                "code": code,
-                "redirect_uri": settings.github_redirect_uri,
-            },
-        )
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await github_service.client.post(
+        "https://github.com/login/oauth/access_token",
+        headers={"Accept": "application/json"},
+        data={
+            "client_id": settings.github_client_id,
+            "client_secret": settings.github_client_secret,
+            "code": code,
+            "redirect_uri": settings.github_redirect_uri,
+        },
+    )
+    resp.raise_for_status()
+    data = resp.json()
     if "error" in data:
         raise HTTPException(status_code=400, detail="GitHub OAuth failed")
     token = data.get("access_token")
@@ -36,34 +35,32 @@ async def _exchange_code_for_token(code: str) -> str:
 
 
 async def _fetch_github_user(access_token: str) -> dict:
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://api.github.com/user",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Accept": "application/vnd.github+json",
-            },
-        )
-        resp.raise_for_status()
-        return resp.json()
+    resp = await github_service.client.get(
+        "https://api.github.com/user",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/vnd.github+json",
+        },
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 async def _fetch_github_repos(access_token: str) -> list[dict]:
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://api.github.com/user/repos",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Accept": "application/vnd.github+json",
-            },
-            params={
-                "per_page": 20,
-                "sort": "updated",
-                "direction": "desc",
-            },
-        )
-        resp.raise_for_status()
-        return resp.json()
+    resp = await github_service.client.get(
+        "https://api.github.com/user/repos",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/vnd.github+json",
+        },
+        params={
+            "per_page": 20,
+            "sort": "updated",
+            "direction": "desc",
+        },
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 async def _upsert_user_and_repos(access_token: str) -> User:
@@ -85,6 +82,8 @@ async def _upsert_user_and_repos(access_token: str) -> User:
         user.avatar_url = gh_user.get("avatar_url", "")
         user.name = gh_user.get("name")
         user.email = gh_user.get("email")
+        # Token rotated: drop the cached plaintext of the old ciphertext
+        forget_decrypted_token(user.access_token)
         user.access_token = encrypt_token(access_token)
         user.updated_at = datetime.utcnow()
     
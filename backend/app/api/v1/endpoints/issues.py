@@ -105,8 +105,9 @@ async def sync_issues_from_github(
     """
     from app.models.repo import Repo
     from app.core.security import decrypt_token
-    import httpx
+    from app.services.github import github_service
     from datetime import datetime
+    from pymongo import UpdateOne
     
     if not current_user.access_token:
         raise HTTPException(status_code=400, detail="No GitHub token stored")
@@ -118,59 +119,54 @@ async def sync_issues_from_github(
     
     # Fetch issues from GitHub
     token = decrypt_token(current_user.access_token)
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}/issues?state=all&per_page=100",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json"
-            }
-        )
-        
-        if resp.status_code != 200:
-            raise HTTPException(status_code=502, detail=f"GitHub API error: {resp.text}")
-        
-        gh_issues = resp.json()
+    resp = await github_service.client.get(
+        f"https://api.github.com/repos/{owner}/{repo}/issues?state=all&per_page=100",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json"
+        }
+    )
     
-    # Sync each issue to DB
-    synced_count = 0
+    if resp.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"GitHub API error: {resp.text}")
+    
+    gh_issues = resp.json()
+    
+    # Sync each issue to DB: one upsert per issue, all sent in a single
+    # bulk write, so existing issues (and their checklists) are never read back
+    now = datetime.utcnow()
+    operations = []
     for gh_issue in gh_issues:
         # Skip pull requests (they show up in issues API)
         if "pull_request" in gh_issue:
             continue
         
-        issue_number = gh_issue.get("number")
-        
-        # Get or create issue
-        issue = await Issue.find_one(
-            Issue.repo_id== repo_doc.id,
-            Issue.issue_number == issue_number
-        )
-        
-        if not issue:
-            issue = Issue(
-                repo_id=repo_doc.id,
-                issue_number=issue_number,
-                title=gh_issue.get("title", ""),
-                description=gh_issue.get("body", ""),
-                status="open" if gh_issue.get("state") == "open" else "completed",
-                github_url=gh_issue.get("html_url", ""),
-                github_state=gh_issue.get("state", "open"),
-                created_at=datetime.fromisoformat(gh_issue.get("created_at", "").replace("Z", "+00:00")),
-                updated_at=datetime.utcnow(),
-                last_synced_at=datetime.utcnow(),
-                checklist=[],
-                checklist_summary={"total": 0, "passed": 0, "failed": 0, "pending": 0}
-            )
-            await issue.save()
-            synced_count += 1
-        else:
-            # Update existing
-            issue.title = gh_issue.get("title", issue.title)
-            issue.description = gh_issue.get("body", issue.description)
-            issue.github_state = gh_issue.get("state", "open")
-            issue.last_synced_at = datetime.utcnow()
-            await issue.save()
+        operations.append(UpdateOne(
+            {"repo_id": repo_doc.id, "issue_number": gh_issue.get("number")},
+            {
+                "$set": {
+                    "title": gh_issue.get("title", ""),
+                    "description": gh_issue.get("body", ""),
+                    "github_state": gh_issue.get("state", "open"),
+                    "last_synced_at": now
+                },
+                # Only for issues not seen before
+                "$setOnInsert": {
+                    "status": "open" if gh_issue.get("state") == "open" else "completed",
+                    "github_url": gh_issue.get("html_url", ""),
+                    "created_at": datetime.fromisoformat(gh_issue.get("created_at", "").replace("Z", "+00:00")),
+                    "updated_at": now,
+                    "checklist": [],
+                    "checklist_summary": {"total": 0, "passed": 0, "failed": 0, "pending": 0}
+                }
+            },
+            upsert=True
+        ))
+    
+    synced_count = 0
+    if operations:
+        result = await Issue.get_motor_collection().bulk_write(operations, ordered=False)
+        synced_count = result.upserted_count
     
     return {
         "success": True,
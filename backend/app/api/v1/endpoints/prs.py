@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from app.models.pr import PullRequest
 from app.models.user import User
 from app.schemas.models import PRSummary
@@ -13,12 +13,14 @@ async def list_prs(
     owner: str, 
     repo: str, 
     background_tasks: BackgroundTasks,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user)
 ):
     if not current_user.access_token:
         raise HTTPException(status_code=400, detail="No GitHub token")
     try:
-        return await pr_service.list_prs(owner, repo, current_user, background_tasks)
+        return await pr_service.list_prs(owner, repo, current_user, background_tasks, limit=limit, offset=offset)
     except Exception as e:
         print(f"Error listing PRs: {str(e)}")
         return []
@@ -1,13 +1,13 @@
 from datetime import datetime
 from typing import List
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 
 from app.models.repo import Repo
 from app.models.user import User
 from app.api.v1.endpoints.me import get_current_user
 from app.core.security import decrypt_token
+from app.services.github import github_service
 
 router = APIRouter(prefix="/repos", tags=["repos"])
 
@@ -20,36 +20,38 @@ async def sync_repo_stats(repo_doc: Repo, access_token: str):
     Fetch fresh stats from GitHub and update local DB.
     Also recalculate health score based on local PR analysis.
     """
-    async with httpx.AsyncClient() as client:
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github+json",
-        }
-        
-        # 1. Fetch PR Count & Issue Count via Search API (most accurate)
-        # We run these in parallel
-        pr_query = f"repo:{repo_doc.owner}/{repo_doc.name} type:pr state:open"
-        issue_query = f"repo:{repo_doc.owner}/{repo_doc.name} type:issue state:open"
+    # Shared pooled client: list_repos syncs every repo at once, and a
+    # client per repo meant a fresh connection + TLS handshake for each
+    client = github_service.client
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/vnd.github+json",
+    }
+    
+    # 1. Fetch PR Count & Issue Count via Search API (most accurate)
+    # We run these in parallel
+    pr_query = f"repo:{repo_doc.owner}/{repo_doc.name} type:pr state:open"
+    issue_query = f"repo:{repo_doc.owner}/{repo_doc.name} type:issue state:open"
+    
+    try:
+        pr_resp, issue_resp, repo_details_resp = await asyncio.gather(
+            client.get(f"https://api.github.com/search/issues?q={pr_query}", headers=headers),
+            client.get(f"https://api.github.com/search/issues?q={issue_query}", headers=headers),
+            client.get(f"https://api.github.com/repos/{repo_doc.owner}/{repo_doc.name}", headers=headers)
+        )
+
+        if pr_resp.status_code == 200:
+            repo_doc.pr_count = pr_resp.json().get("total_count", 0)
         
-        try:
-            pr_resp, issue_resp, repo_details_resp = await asyncio.gather(
-                client.get(f"https://api.github.com/search/issues?q={pr_query}", headers=headers),
-                client.get(f"https://api.github.com/search/issues?q={issue_query}", headers=headers),
-                client.get(f"https://api.github.com/repos/{repo_doc.owner}/{repo_doc.name}", headers=headers)
-            )
-
-            if pr_resp.status_code == 200:
-                repo_doc.pr_count = pr_resp.json().get("total_count", 0)
+        if issue_resp.status_code == 200:
+            repo_doc.issue_count = issue_resp.json().get("total_count", 0)
             
-            if issue_resp.status_code == 200:
-                repo_doc.issue_count = issue_resp.json().get("total_count", 0)
-                
-            if repo_details_resp.status_code == 200:
-                data = repo_details_resp.json()
-                repo_doc.last_activity = data.get("pushed_at")
+        if repo_details_resp.status_code == 200:
+            data = repo_details_resp.json()
+            repo_doc.last_activity = data.get("pushed_at")
 
-        except Exception as e:
-            print(f"Error syncing stats for {repo_doc.repo_full_name}: {e}")
+    except Exception as e:
+        print(f"Error syncing stats for {repo_doc.repo_full_name}: {e}")
 
     # 2. Recalculate Health Score based on LOCAL analyzed PRs
     local_prs = await PullRequest.find(
@@ -119,38 +121,37 @@ async def list_available_repos(current_user: User = Depends(get_current_user)):
             detail="No GitHub token stored for user",
         )
     
-    async with httpx.AsyncClient() as client:
-        # Fetch up to 100 repos sorted by updated time
-        raw_token = decrypt_token(current_user.access_token)
-        resp = await client.get(
-            "https://api.github.com/user/repos?sort=updated&per_page=100",
-            headers={
-                "Authorization": f"Bearer {raw_token}",
-                "Accept": "application/vnd.github+json",
-            },
+    # Fetch up to 100 repos sorted by updated time
+    raw_token = decrypt_token(current_user.access_token)
+    resp = await github_service.client.get(
+        "https://api.github.com/user/repos?sort=updated&per_page=100",
+        headers={
+            "Authorization": f"Bearer {raw_token}",
+            "Accept": "application/vnd.github+json",
+        },
+    )
+    if resp.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"GitHub API error: {resp.text}",
         )
-        if resp.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"GitHub API error: {resp.text}",
-            )
-        
-        repos = resp.json()
+    
+    repos = resp.json()
+    
+    # Return simplified list
+    results = []
+    for r in repos:
+        results.append({
+            "id": r.get("id"),
+            "name": r.get("name"),
+            "full_name": r.get("full_name"),
+            "private": r.get("private"),
+            "description": r.get("description"),
+            "html_url": r.get("html_url"),
+            "updated_at": r.get("updated_at")
+        })
         
-        # Return simplified list
-        results = []
-        for r in repos:
-            results.append({
-                "id": r.get("id"),
-                "name": r.get("name"),
-                "full_name": r.get("full_name"),
-                "private": r.get("private"),
-                "description": r.get("description"),
-                "html_url": r.get("html_url"),
-                "updated_at": r.get("updated_at")
-            })
-            
-        return results
+    return results
 
 
 @router.post("/add", response_model=Repo, status_code=status.HTTP_201_CREATED)
@@ -180,20 +181,19 @@ async def add_repo(
 
     raw_token = decrypt_token(access_token)
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"https://api.github.com/repos/{owner}/{name}",
-            headers={
-                "Authorization": f"Bearer {raw_token}",
-                "Accept": "application/vnd.github+json",
-            },
+    resp = await github_service.client.get(
+        f"https://api.github.com/repos/{owner}/{name}",
+        headers={
+            "Authorization": f"Bearer {raw_token}",
+            "Accept": "application/vnd.github+json",
+        },
+    )
+    if resp.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Repository not found on GitHub: {resp.text}",
         )
-        if resp.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found on GitHub: {resp.text}",
-            )
-        repo_data = resp.json()
+    repo_data = resp.json()
 
     now = datetime.utcnow()
 
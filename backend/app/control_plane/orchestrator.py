@@ -93,6 +93,12 @@ class Orchestrator:
             pr.last_synced_at = datetime.utcnow()
             await pr.save()
             
+            # New commits: cached PR reads and diffs are stale
+            from app.services.github import github_service
+            repo = await Repo.get(event.repo_id)
+            if repo:
+                github_service.invalidate_pr(repo.owner, repo.name, pr_number)
+            
             # Could trigger partial re-validation here
             # await pr_validation_pipeline.run_partial(pr)
     
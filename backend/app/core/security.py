@@ -1,7 +1,13 @@
+import time
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Tuple
 from cryptography.fernet import Fernet
 from app.core.config import get_settings
 
+@lru_cache(maxsize=1)
 def _get_fernet():
+    # Key derivation depends only on the configured secret: build once
     key = get_settings().secret_key
     # Fernet requires 32 url-safe base64 bytes. 
     # If config secret is arbitrary, we hash it to fit.
@@ -28,3 +34,28 @@ def decrypt_token(encrypted_token: str) -> str:
         # For migration safety, returning as causes potential issues if not careful.
         # But here we assume fresh start.
         return ""
+
+# Decrypted tokens, keyed by ciphertext: (plaintext, expires_at monotonic).
+# A re-encrypted token is a new key; the TTL bounds how long plaintexts stay.
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_SIZE = 10_000
+_token_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+def decrypt_token_cached(encrypted_token: str) -> str:
+    # GitHub calls decrypt the same user token hundreds of times per audit
+    now = time.monotonic()
+    hit = _token_cache.get(encrypted_token)
+    if hit is not None and hit[1] > now:
+        _token_cache.move_to_end(encrypted_token)
+        return hit[0]
+    
+    token = decrypt_token(encrypted_token)
+    _token_cache[encrypted_token] = (token, now + TOKEN_CACHE_TTL)
+    _token_cache.move_to_end(encrypted_token)
+    if len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+    return token
+
+def forget_decrypted_token(encrypted_token: str) -> None:
+    """Drop a cached plaintext (token rotated or rejected by GitHub)."""
+    _token_cache.pop(encrypted_token, None)
@@ -8,15 +8,22 @@ from app.api.v1.endpoints import auth, issues, me, notifications, prs, repos, an
 
 # Placeholder for scheduler - will be implemented later
 from app.tasks.scheduler import start_scheduler, stop_scheduler
+from app.services.github import github_service
+from app.services.audit.scanner import audit_scanner
+from app.services.audit.process_pool import shutdown_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await audit_scanner.fail_interrupted_scans()
     start_scheduler()
     yield
     # Shutdown
     await stop_scheduler()
+    await github_service.aclose()
+    await audit_scanner.aclose()
+    shutdown_pool()
 
 settings = get_settings()
 
@@ -12,7 +12,12 @@ from pydantic import Field, BaseModel
 
 # Shared Finding model (can also import from audit_schema.py)
 class Finding(BaseModel):
-    """Issue discovered by deterministic rules"""
+    """
+    Issue discovered by deterministic rules.
+    
+    Dimension scanners build these with model_construct: every field comes
+    from rule constants and cached metrics, so per-finding validation is skipped.
+    """
     
     id: str
     rule_id: str  # e.g. "SEC001", "PERF003", "QUAL001"
@@ -120,6 +125,9 @@ class FileMetricCache(Document):
     indent_depth: int = 0  # Maximum indent level
     churn_90d: int = 0  # Commits in last 90 days
     has_test: bool = False  # Test coverage detected
+    # TestCoverageDetector.VERSION that produced has_test; None when coverage
+    # was not detected (entries from before versioning, or detection failed)
+    test_detector_version: Optional[int] = None
     
     # Language info
     language: str = "unknown"  # "python", "javascript", "typescript", etc.
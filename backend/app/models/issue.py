@@ -50,3 +50,9 @@ class Issue(Document):
 
     class Settings:
         name = "issues"
+        indexes = [
+            # find_one / $in lookups by number within a repo
+            [("repo_id", 1), ("issue_number", 1)],
+            # list_issues: newest first within a repo
+            [("repo_id", 1), ("created_at", -1)]
+        ]
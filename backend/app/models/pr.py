@@ -75,6 +75,8 @@ class PullRequest(Document):
     author: str
     created_at: datetime
     github_url: str
+    # PR description as of the last sync; None for PRs synced before it was stored
+    body: Optional[str] = None
     
     # Analysis fields
     health_score: int = 0
@@ -102,3 +104,16 @@ class PullRequest(Document):
 
     class Settings:
         name = "pull_requests"
+        indexes = [
+            # find_one by number within a repo, and list_prs' newest-first sort
+            [("repo_id", 1), ("pr_number", -1)],
+            # job_validate_pending_prs
+            [("validation_status", 1)]
+        ]
+
+
+class PRSyncView(BaseModel):
+    """Projection of the fields the GitHub sync refreshes"""
+    pr_number: int
+    title: str
+    body: Optional[str] = None
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
-from beanie import Document
-from pydantic import Field
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
 
 class Repo(Document):
     repo_full_name: str
@@ -16,3 +16,12 @@ class Repo(Document):
 
     class Settings:
         name = "repos"
+        indexes = [
+            # owner/name lookups from the issue and PR endpoints
+            [("owner", 1), ("name", 1)]
+        ]
+
+
+class RepoIdView(BaseModel):
+    """Projection for lookups that only need the repo's id"""
+    id: PydanticObjectId = Field(alias="_id")
@@ -10,6 +10,9 @@ class CodeAntEngine:
     - Security Vulnerability Detection (OWASP)
     - Code Pattern Review
     """
+    # Longest diff prefix included in the review prompt
+    MAX_DIFF_CHARS = 15000
+    
     def __init__(self, client: AsyncGroq):
         self.client = client
 
@@ -26,7 +29,7 @@ class CodeAntEngine:
         PR Title: {title}
         Checklist: {checklist_str}
         Code Diff:
-        {diff[:15000]}
+        {diff[:self.MAX_DIFF_CHARS]}
 
         EVALUATION RULES:
 
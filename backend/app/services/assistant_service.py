@@ -11,6 +11,9 @@ class RevFloAssistant:
     Unified AI Assistant Service for RevFlo.
     Exposes Intent, Change, and Risk intelligence layers.
     """
+    # No engine reads more of a PR diff than this
+    MAX_DIFF_CHARS = CodeAntEngine.MAX_DIFF_CHARS
+    
     def __init__(self):
         self.settings = get_settings()
         self.client = AsyncGroq(api_key=self.settings.groq_api_key)
@@ -4,8 +4,10 @@ Calculates file change frequency from GitHub API
 """
 import logging
 from typing import Dict
+from collections import Counter
 from datetime import datetime, timedelta
 import aiohttp
+from app.services.github import github_service
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +59,16 @@ class ChurnCalculator:
             # Limit to top 20 files to avoid rate limits
             files_to_check = file_paths[:20] if len(file_paths) > 20 else file_paths
             
+            # Per-file history counts in batched GraphQL requests
+            commit_counts = await github_service.fetch_files_commit_counts(
+                owner, repo, files_to_check, github_token, since_days=days
+            )
+            if commit_counts is not None:
+                logger.info(f"Calculated churn for {len(commit_counts)} files")
+                return commit_counts
+            
+            logger.warning("GraphQL churn query failed, falling back to commit listing")
+            
             async with aiohttp.ClientSession() as session:
                 # Get commits since date
                 params = {
@@ -72,27 +84,24 @@ class ChurnCalculator:
                     commits = await response.json()
                     logger.info(f"Found {len(commits)} commits in last {days} days")
                     
-                    # For each file, count how many commits touched it
-                    for file_path in files_to_check:
-                        count = 0
-                        
-                        for commit in commits:
-                            commit_sha = commit['sha']
-                            
-                            # Get commit details to see which files changed
-                            commit_url = f"{api_url}/{commit_sha}"
-                            async with session.get(commit_url, headers=headers) as commit_response:
-                                if commit_response.status == 200:
-                                    commit_data = await commit_response.json()
-                                    
-                                    # Check if this file was modified
-                                    if 'files' in commit_data:
-                                        for file in commit_data['files']:
-                                            if file['filename'] == file_path:
-                                                count += 1
-                                                break
+                    # Fetch each commit's details once and tally the
+                    # tracked files it touched (instead of once per file)
+                    tracked = set(files_to_check)
+                    commit_counts = Counter()
+                    
+                    for commit in commits:
+                        commit_sha = commit['sha']
                         
-                        churn_map[file_path] = count
+                        # Get commit details to see which files changed
+                        commit_url = f"{api_url}/{commit_sha}"
+                        async with session.get(commit_url, headers=headers) as commit_response:
+                            if commit_response.status == 200:
+                                commit_data = await commit_response.json()
+                                touched = {file['filename'] for file in commit_data.get('files', [])}
+                                commit_counts.update(touched & tracked)
+                    
+                    for file_path in files_to_check:
+                        churn_map[file_path] = commit_counts[file_path]
                     
                     logger.info(f"Calculated churn for {len(churn_map)} files")
                     
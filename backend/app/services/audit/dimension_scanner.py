@@ -3,11 +3,26 @@ Abstract Base Class for V3 Dimension Scanners
 Defines the contract all dimension scanners must implement
 """
 from abc import ABC, abstractmethod
+from collections import Counter
 from typing import Set, Dict, Any, List
 from pathlib import Path
 from app.models.audit_v3 import DimensionScanResult, Finding
 
 
+# Points deducted from 100 per finding, by severity
+SEVERITY_DEDUCTIONS = {"critical": 20, "high": 10, "medium": 5, "low": 2}
+
+
+def deduction_score(findings: List[Finding]) -> int:
+    """
+    Standard dimension score: 100 minus SEVERITY_DEDUCTIONS per finding,
+    floored at 0. Severities are counted once, then weighted per bucket.
+    """
+    counts = Counter(finding.severity for finding in findings)
+    deducted = sum(SEVERITY_DEDUCTIONS.get(severity, 0) * n for severity, n in counts.items())
+    return max(0, 100 - deducted)
+
+
 class RepoContext:
     """Context data passed to scanners"""
     def __init__(
@@ -27,6 +42,12 @@ class RepoContext:
 
 class FileMetrics:
     """File-level metrics from cache"""
+    # One instance per file in the repo; slots drop the per-instance __dict__
+    __slots__ = (
+        "file_path", "loc", "complexity", "indent_depth",
+        "churn_90d", "has_test", "language"
+    )
+
     def __init__(
         self,
         file_path: str,
@@ -93,21 +114,14 @@ class DimensionScanner(ABC):
         """
         pass
     
-    @abstractmethod
     def calculate_score(self, findings: List[Finding]) -> int:
         """
         Calculate 0-100 score from findings.
         
         MUST be deterministic - no AI, no randomness.
         
-        Typical algorithm:
-            score = 100
-            for finding in findings:
-                if finding.severity == "critical": score -= 20
-                elif finding.severity == "high": score -= 10
-                elif finding.severity == "medium": score -= 5
-                elif finding.severity == "low": score -= 2
-            return max(0, score)
+        Default algorithm (deduction_score): 100 minus SEVERITY_DEDUCTIONS
+        per finding, floored at 0. Override for a dimension-specific formula.
         
         Args:
             findings: List of issues discovered
@@ -115,7 +129,7 @@ class DimensionScanner(ABC):
         Returns:
             Integer score 0-100
         """
-        pass
+        return deduction_score(findings)
     
     async def should_run_ai(self, scan_result: DimensionScanResult) -> bool:
         """
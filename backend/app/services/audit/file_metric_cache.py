@@ -60,12 +60,14 @@ class FileMetricCacheService:
         repo_id: PydanticObjectId,
         commit_sha: str,
         file_path: str,
-        metrics: FileMetrics
+        metrics: FileMetrics,
+        test_detector_version: Optional[int] = None
     ) -> None:
         """
         Store metrics in cache.
         
-        Upserts if entry already exists.
+        Upserts if entry already exists. test_detector_version records which
+        detector produced has_test; leave it None when coverage wasn't detected.
         """
         cache_entry = FileMetricCache(
             repo_id=repo_id,
@@ -76,6 +78,7 @@ class FileMetricCacheService:
             indent_depth=metrics.indent_depth,
             churn_90d=metrics.churn_90d,
             has_test=metrics.has_test,
+            test_detector_version=test_detector_version,
             language=metrics.language,
             computed_at=datetime.utcnow()
         )
@@ -94,6 +97,7 @@ class FileMetricCacheService:
             existing.indent_depth = metrics.indent_depth
             existing.churn_90d = metrics.churn_90d
             existing.has_test = metrics.has_test
+            existing.test_detector_version = test_detector_version
             existing.language = metrics.language
             existing.computed_at = datetime.utcnow()
             await existing.save()
@@ -119,9 +123,10 @@ class FileMetricCacheService:
         ).to_list()
         
         result = {}
+        now = datetime.utcnow()  # One clock read for the whole batch
         for entry in entries:
             # Skip expired
-            age = datetime.utcnow() - entry.computed_at
+            age = now - entry.computed_at
             if age.total_seconds() > entry.ttl:
                 continue
             
@@ -138,6 +143,31 @@ class FileMetricCacheService:
         logger.info(f"Loaded {len(result)} cached metrics for commit {commit_sha[:7]}")
         return result
     
+    async def get_test_coverage_for_commit(
+        self,
+        repo_id: PydanticObjectId,
+        commit_sha: str,
+        test_detector_version: int
+    ) -> Dict[str, bool]:
+        """
+        Get cached has_test values for a commit.
+        
+        Only entries whose coverage came from a successful detection by the
+        given detector version are returned: {file_path: has_test}
+        """
+        entries = await FileMetricCache.find(
+            FileMetricCache.repo_id == repo_id,
+            FileMetricCache.commit_sha == commit_sha,
+            FileMetricCache.test_detector_version == test_detector_version
+        ).to_list()
+        
+        now = datetime.utcnow()
+        return {
+            entry.file_path: entry.has_test
+            for entry in entries
+            if (now - entry.computed_at).total_seconds() <= entry.ttl
+        }
+    
     async def invalidate_old_entries(self, days: int = 30) -> int:
         """
         Clean up cache entries older than N days.
@@ -0,0 +1,60 @@
+"""
+Repository tree walk shared by the V2 scanner and the V3 audit, so both
+prune directories and classify test code the same way.
+"""
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+# Directories never worth scanning; pruned before descending
+SKIP_DIRS = frozenset({'.git', 'node_modules', '.venv', 'dist', 'build', '__pycache__'})
+
+# Extensions of source files that get complexity and churn analysis
+CODE_EXTS = frozenset({'.py', '.js', '.ts', '.java', '.cpp', '.tsx', '.jsx'})
+
+# Directory path fragments: everything below a match is test code
+TEST_DIR_PATTERNS = ('test', 'tests', '__test__', '__tests__', 'spec', 'specs')
+
+# Relative path fragments of test files kept out of source metrics
+TEST_FILE_PATTERNS = ('test_', '_test.', 'test.', 'spec_', '_spec.', 'spec.')
+
+
+def walk_files(scan_dir: Path) -> Iterator[Tuple[os.DirEntry, str, bool]]:
+    """
+    Yield (entry, rel_path, in_test_dir) for every file under scan_dir.
+
+    Iterative pre-order os.scandir walk, in the same order as os.walk. Each
+    entry caches its stat() result, and rel_path is sliced off the entry
+    path with '/' separators. SKIP_DIRS and symlinked directories are not
+    descended into, and unreadable directories are skipped. in_test_dir
+    matches TEST_DIR_PATTERNS against the directory's path below scan_dir.
+    """
+    prefix_len = len(str(scan_dir)) + 1
+    pending_dirs = [str(scan_dir)]
+    while pending_dirs:
+        root = pending_dirs.pop()
+        root_lower = root[prefix_len:].lower()
+        in_test_dir = any(pattern in root_lower for pattern in TEST_DIR_PATTERNS)
+
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if entry.name not in SKIP_DIRS and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
+            except OSError:
+                continue
+
+            rel_path = entry.path[prefix_len:]
+            if os.sep != '/':
+                rel_path = rel_path.replace(os.sep, '/')
+            yield entry, rel_path, in_test_dir
+
+        pending_dirs.extend(reversed(subdirs))
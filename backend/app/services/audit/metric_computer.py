@@ -4,76 +4,98 @@ Calculates file-level metrics (complexity, LOC, etc.)
 """
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from radon.complexity import cc_visit
 
 logger = logging.getLogger(__name__)
 
 
-class MetricComputer:
+def line_metrics(lines: List[str]) -> Tuple[int, int, int]:
     """
-    Computes file-level metrics.
+    Fused per-line kernel: returns (loc, indent_depth, proxy_complexity).
     
-    Shared by:
-    - V2 scanner (scanner.py)
-    - V3 dimension scanners
+    - loc: non-empty, non-comment lines
+    - indent_depth: max indentation of non-blank lines (4-space indents)
+    - proxy_complexity: V1 proxy (deep nesting + long lines), used for
+      non-Python files or when Radon fails
     """
-    
-    @staticmethod
-    def calculate_loc(lines: List[str]) -> int:
-        """Calculate lines of code (non-empty, non-comment)"""
-        return len([l for l in lines if l.strip() and not l.strip().startswith('#')])
-    
-    @staticmethod
-    def calculate_indent_depth(lines: List[str]) -> int:
-        """Calculate maximum indentation depth"""
-        max_depth = 0
-        for line in lines:
-            if line.strip():
-                stripped = line.lstrip()
-                indent = len(line) - len(stripped)
-                spaces = indent // 4  # Assuming 4-space indents
-                max_depth = max(max_depth, spaces)
-        return max_depth
-    
-    @staticmethod
-    def calculate_complexity(content: str, file_path: str) -> int:
-        """
-        Calculate cyclomatic complexity.
+    loc = 0
+    max_indent = 0
+    score = 0
+    for line in lines:
+        length = len(line)
+        if not length:
+            continue
+        if length > 120:
+            score += 0.5  # Long lines
+        if line[0].isspace():
+            # Only indented lines pay for the stripped copy
+            stripped = line.lstrip()
+            indent = length - len(stripped)
+            if indent >= 8:
+                score += 1  # Deep nesting
+            if not stripped:
+                continue
+            if indent > max_indent:
+                max_indent = indent
+            first = stripped[0]
+        else:
+            first = line[0]
+        if first != '#':
+            loc += 1
+    return loc, max_indent // 4, int(score)
+
+
+def analyze_source_file(path: Path, rel_path: str) -> Optional[Dict]:
+    """
+    Compute complexity, LOC and indent depth for a single source file.
+    Runs in the audit worker processes, which only import this module;
+    returns None if the file cannot be analyzed.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            head = f.read(4096)
+            # Minified/bundled code: a full 4 KB prefix with almost no line breaks
+            if len(head) == 4096 and head.count('\n') < 5:
+                return None
+            content = head + f.read()
+            lines = content.splitlines()
         
-        - Python: Uses Radon for real complexity
-        - Other languages: Uses proxy heuristic
-        """
-        lines = content.splitlines()
+        # LOC, indent depth and proxy complexity in a single pass
+        loc, indent_depth, proxy_complexity = line_metrics(lines)
         
-        # Real complexity for Python
-        if file_path.endswith('.py'):
+        # V2: Real cyclomatic complexity for Python files
+        complexity = 0
+        if rel_path.endswith('.py'):
             try:
                 complexity_results = cc_visit(content)
                 # Sum complexity of all functions/methods
-                return sum(item.complexity for item in complexity_results)
+                complexity = sum(item.complexity for item in complexity_results)
             except Exception as e:
-                logger.warning(f"Radon failed for {file_path}, using proxy: {e}")
-                return MetricComputer._proxy_complexity(lines)
+                logger.warning(f"Radon failed for {rel_path}, using proxy: {e}")
+                # Fallback to proxy for Python if Radon fails
+                complexity = proxy_complexity
         else:
-            # Proxy for other languages
-            return MetricComputer._proxy_complexity(lines)
+            # V1 Proxy for non-Python files
+            complexity = proxy_complexity
+        
+        return {
+            'complexity': complexity,
+            'loc': loc,
+            'indent_depth': indent_depth
+        }
+    except Exception as e:
+        logger.warning(f"Failed to analyze {path.name}: {e}")
+        return None
+
+
+class MetricComputer:
+    """
+    Computes file-level metrics for the V3 dimension scanners.
     
-    @staticmethod
-    def _proxy_complexity(lines: List[str]) -> int:
-        """
-        Proxy complexity heuristic for non-Python files.
-        Counts deep nesting and long lines.
-        """
-        score = 0
-        for line in lines:
-            stripped = line.lstrip()
-            indent = len(line) - len(stripped)
-            if indent >= 8:
-                score += 1  # Deep nesting
-            if len(line) > 120:
-                score += 0.5  # Long lines
-        return int(score)
+    The V2 scanner (scanner.py) calls analyze_source_file; both use the
+    same line_metrics kernel.
+    """
     
     @staticmethod
     def analyze_file(file_path: Path, rel_path: str) -> Optional[Dict]:
@@ -85,7 +107,15 @@ class MetricComputer:
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
-                lines = content.splitlines()
+            
+            loc, indent_depth, complexity = line_metrics(content.splitlines())
+            
+            # Real complexity for Python; the line proxy stays as fallback
+            if rel_path.endswith('.py'):
+                try:
+                    complexity = sum(item.complexity for item in cc_visit(content))
+                except Exception as e:
+                    logger.warning(f"Radon failed for {rel_path}, using proxy: {e}")
             
             # Determine language
             lang = "unknown"
@@ -99,9 +129,9 @@ class MetricComputer:
                 lang = "cpp"
             
             return {
-                'complexity': MetricComputer.calculate_complexity(content, rel_path),
-                'loc': MetricComputer.calculate_loc(lines),
-                'indent_depth': MetricComputer.calculate_indent_depth(lines),
+                'complexity': complexity,
+                'loc': loc,
+                'indent_depth': indent_depth,
                 'language': lang
             }
         except Exception as e:
@@ -14,7 +14,9 @@ from beanie import PydanticObjectId
 from app.models.audit_v3 import AuditRun
 from app.services.audit.git_diff_analyzer import GitDiffAnalyzer
 from app.services.audit.file_metric_cache import FileMetricCacheService
+from app.services.audit.file_walker import CODE_EXTS, TEST_FILE_PATTERNS, walk_files
 from app.services.audit.metric_computer import MetricComputer
+from app.services.audit.process_pool import map_in_pool
 from app.services.audit.churn_calculator import ChurnCalculator
 from app.services.audit.test_coverage_detector import TestCoverageDetector
 from app.services.audit.dimension_scanner import RepoContext, FileMetrics
@@ -24,7 +26,8 @@ from app.services.audit.scanners import (
     TestingConfidenceScanner,
     ArchitectureScanner,
     PerformanceScanner,
-    SecurityScanner
+    SecurityScanner,
+    run_all
 )
 from app.core.config import get_settings
 
@@ -51,6 +54,14 @@ class AuditOrchestratorV3:
         self.architecture_scanner = ArchitectureScanner()
         self.performance_scanner = PerformanceScanner()
         self.security_scanner = SecurityScanner()
+        self.scanners = [
+            self.code_quality_scanner,
+            self.maintainability_scanner,
+            self.testing_scanner,
+            self.architecture_scanner,
+            self.performance_scanner,
+            self.security_scanner
+        ]
         
         self.settings = get_settings()
     
@@ -118,45 +129,26 @@ class AuditOrchestratorV3:
             # Step 3: Run all 6 dimension scanners in parallel
             logger.info("Running all dimension scanners in parallel...")
             
-            scanner_tasks = []
-            
             # Always run all scanners (feature flags checked inside)
-            scanner_tasks.append(
-                self.code_quality_scanner.scan(repo_context, set(), metric_cache)
-            )
-            scanner_tasks.append(
-                self.maintainability_scanner.scan(repo_context, set(), metric_cache)
-            )
-            scanner_tasks.append(
-                self.testing_scanner.scan(repo_context, set(), metric_cache)
-            )
-            scanner_tasks.append(
-                self.architecture_scanner.scan(repo_context, set(), metric_cache)
-            )
-            scanner_tasks.append(
-                self.performance_scanner.scan(repo_context, set(), metric_cache)
-            )
-            scanner_tasks.append(
-                self.security_scanner.scan(repo_context, set(), metric_cache)
-            )
-            
-            # Execute all scanners concurrently
-            scan_results = await asyncio.gather(*scanner_tasks, return_exceptions=True)
+            scan_results = await run_all(self.scanners, repo_context, set(), metric_cache)
             
             # Step 4: Save scan results and link to audit run
             total_issues = 0
             score_sum = 0
             successful_scans = 0
             
+            completed_scans = []
             for result in scan_results:
                 if isinstance(result, Exception):
                     logger.error(f"Scanner failed: {result}")
                     continue
-                
-                # Save scan result
                 result.audit_run_id = audit_run.id
-                await result.save()
-                
+                completed_scans.append(result)
+            
+            # Save scan results concurrently (independent documents)
+            await asyncio.gather(*(result.save() for result in completed_scans))
+            
+            for result in completed_scans:
                 # Link to audit run
                 if result.scan_type == "code_quality":
                     audit_run.code_quality_scan_id = result.id
@@ -220,45 +212,49 @@ class AuditOrchestratorV3:
         """
         metrics_dict = {}
         file_paths = []
+        sources = []
+        test_files = []
         
         # Step 1: Compute basic metrics (LOC, complexity, indent depth)
-        for root, _, files in os.walk(scan_dir):
-            # Skip .git
-            if ".git" in root:
-                continue
+        for entry, rel_path, in_test_dir in walk_files(scan_dir):
+            # Phase 4: Collect test files here so coverage detection
+            # doesn't need a second walk of the tree
+            if in_test_dir or TestCoverageDetector.is_test_name(entry.name):
+                test_files.append(rel_path)
             
-            # Skip test directories
-            root_lower = root.lower()
-            if any(pattern in root_lower for pattern in ['test', 'tests', '__test__', '__tests__', 'spec', 'specs']):
+            # Test directories only contribute test files, not metrics
+            if in_test_dir:
                 continue
             
-            for file in files:
-                # Only analyze code files
-                if file.endswith(('.py', '.js', '.ts', '.java', '.cpp', '.tsx', '.jsx')):
-                    file_path = Path(root) / file
-                    rel_path = str(file_path.relative_to(scan_dir)).replace('\\', '/')
-                    
-                    # Skip test files
-                    rel_path_lower = rel_path.lower()
-                    if any(pattern in rel_path_lower for pattern in ['test_', '_test.', 'test.', 'spec_', '_spec.', 'spec.']):
-                        continue
-                    
-                    # Compute metrics
-                    result = MetricComputer.analyze_file(file_path, rel_path)
-                    
-                    if result:
-                        file_metrics = FileMetrics(
-                            file_path=rel_path,
-                            loc=result['loc'],
-                            complexity=result['complexity'],
-                            indent_depth=result['indent_depth'],
-                            churn_90d=0,  # To be updated below
-                            has_test=False,  # To be updated below
-                            language=result['language']
-                        )
-                        
-                        metrics_dict[rel_path] = file_metrics
-                        file_paths.append(rel_path)
+            # Only analyze code files, skipping tests
+            if os.path.splitext(entry.name)[1] in CODE_EXTS:
+                rel_path_lower = rel_path.lower()
+                if any(pattern in rel_path_lower for pattern in TEST_FILE_PATTERNS):
+                    continue
+                
+                sources.append((Path(entry.path), rel_path))
+        
+        # Metric computation is CPU-bound: fan it out across cores in the
+        # worker pool shared with the V2 scanner
+        rel_paths = [rel_path for _, rel_path in sources]
+        results = await map_in_pool(
+            MetricComputer.analyze_file, [path for path, _ in sources], rel_paths
+        )
+        
+        for rel_path, result in zip(rel_paths, results):
+            if result:
+                file_metrics = FileMetrics(
+                    file_path=rel_path,
+                    loc=result['loc'],
+                    complexity=result['complexity'],
+                    indent_depth=result['indent_depth'],
+                    churn_90d=0,  # To be updated below
+                    has_test=False,  # To be updated below
+                    language=result['language']
+                )
+                
+                metrics_dict[rel_path] = file_metrics
+                file_paths.append(rel_path)
         
         logger.info(f"Computed basic metrics for {len(metrics_dict)} files")
         
@@ -280,23 +276,38 @@ class AuditOrchestratorV3:
                 logger.warning(f"Churn calculation failed, skipping: {e}")
         
         # Step 3: Detect test coverage (Phase 4)
+        # Version of the detector that produced the coverage, or None when
+        # detection failed (then has_test stays False and isn't cached as known)
+        coverage_version = None
         try:
-            logger.info("Detecting test coverage...")
-            coverage_map = self.test_detector.detect_test_coverage(
-                scan_dir, file_paths
+            # Coverage depends only on the tree at this commit, so a previous
+            # audit of the same SHA may already have stored it in the metric
+            # cache; only coverage from a successful run of this detector
+            # version is trusted
+            cached = await self.cache_service.get_test_coverage_for_commit(
+                repo_id, commit_sha, TestCoverageDetector.VERSION
             )
+            if file_paths and all(file_path in cached for file_path in file_paths):
+                logger.info(f"Reusing cached test coverage for commit {commit_sha[:7]}")
+                coverage_map = {file_path: cached[file_path] for file_path in file_paths}
+            else:
+                logger.info("Detecting test coverage...")
+                coverage_map = self.test_detector.detect_test_coverage(
+                    scan_dir, file_paths, test_files
+                )
             
             # Update metrics with test coverage
             for file_path, has_test in coverage_map.items():
                 if file_path in metrics_dict:
                     metrics_dict[file_path].has_test = has_test
+            coverage_version = TestCoverageDetector.VERSION
         except Exception as e:
             logger.warning(f"Test detection failed, skipping: {e}")
         
         # Step 4: Store all metrics in cache
         for rel_path, file_metrics in metrics_dict.items():
             await self.cache_service.set_metrics(
-                repo_id, commit_sha, rel_path, file_metrics
+                repo_id, commit_sha, rel_path, file_metrics, coverage_version
             )
         
         return metrics_dict
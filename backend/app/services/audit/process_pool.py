@@ -0,0 +1,60 @@
+"""
+Shared worker processes for CPU-bound audit work (per-file metric scoring).
+
+One executor serves every scan and audit for the life of the server, so
+workers are started once rather than per scan. It uses the "spawn" start
+method: forking the server process (event loop, Motor and APScheduler
+threads) is unsafe, and fork is still the Linux default on Python 3.10.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Files sent to a worker per task: amortizes pickling/IPC per file
+CHUNK_SIZE = 32
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared executor, created on first use."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _POOL
+
+
+def _apply_chunk(fn: Callable[..., Any], chunk: Sequence[Tuple]) -> List[Any]:
+    return [fn(*args) for args in chunk]
+
+
+async def map_in_pool(fn: Callable[..., Any], *iterables: Iterable) -> List[Any]:
+    """
+    fn(*args) for each zip of iterables, computed in the shared pool, in
+    order. fn must be a picklable module-level callable. Nothing is
+    submitted (and no pool is started) when there are no items.
+    """
+    items = list(zip(*iterables))
+    if not items:
+        return []
+
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(pool, _apply_chunk, fn, items[i:i + CHUNK_SIZE])
+        for i in range(0, len(items), CHUNK_SIZE)
+    ))
+    return [result for chunk in chunks for result in chunk]
+
+
+def shutdown_pool():
+    """Stop the workers (application shutdown) without blocking on queued files."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
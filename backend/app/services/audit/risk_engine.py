@@ -1,132 +1,183 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from app.models.scan import RiskItem
 from app.services.audit.config_parser import RevFloConfig
-import uuid
+import re
+import secrets
+
+# Matches test files, test directories and spec files (case-insensitive)
+_TEST_PATH_RE = re.compile(r'(?i)(?:__tests?__|test|spec)')
+
+# A compiled rule: (path, file_metrics, churn) -> finding or None
+Rule = Callable[[str, Dict[str, Any], int], Optional[RiskItem]]
+
+def _risk_item(**fields) -> RiskItem:
+    """Shared RiskItem factory; assigns a random finding id."""
+    # Ids are persisted with scans and keyed on by clients, so they must be
+    # unique across scans, processes and restarts (a counter restarts at 0)
+    return RiskItem(id=f"risk-{secrets.token_hex(8)}", **fields)
 
 class RiskEngine:
     """
     Deterministic risk analysis engine with configurable rules.
     V2: Now supports custom thresholds and severity via RevFloConfig.
     """
-    
+
     def __init__(self, config: RevFloConfig = None):
         """Initialize with custom or default configuration."""
         self.config = config or RevFloConfig()
-    
-    def analyze(self, file_metrics: List[Dict[str, Any]], churn_metrics: Dict[str, int]) -> List[RiskItem]:
-        """
-        Analyze metrics using configured rules and thresholds.
-        Returns deterministic findings based on hard rules.
-        """
-        findings = []
-        
-        # Filter out test files - we don't want to audit tests themselves
-        production_files = []
-        for file in file_metrics:
-            path_lower = file['path'].lower()
-            # Skip test files, test directories, and spec files
-            if any(pattern in path_lower for pattern in ['test', 'spec', '__test__', '__tests__']):
-                continue
-            production_files.append(file)
-        
-        for file in production_files:
-            path = file['path']
-            complexity = file.get('complexity', 0)
-            loc = file.get('loc', 0)
-            indent = file.get('indent_depth', 0)
-            churn = churn_metrics.get(path, 0)
-            
-            # Rule 1: Hotspot (High Complexity + High Churn)
-            if self.config.is_rule_enabled("hotspot"):
-                complexity_threshold = self.config.get_threshold("hotspot", "complexity")
-                churn_threshold = self.config.get_threshold("hotspot", "churn")
-                
-                if complexity > complexity_threshold and churn > churn_threshold:
-                    findings.append(RiskItem(
-                        id=str(uuid.uuid4()),
+        # Config is fixed for the engine's lifetime, so thresholds and
+        # severities are bound into the rule closures once, not per file
+        self._rules = self._compile_rules()
+
+    def _compile_rules(self) -> List[Rule]:
+        """Build the enabled rules, in evaluation order, from the config."""
+        config = self.config
+        rules: List[Rule] = []
+
+        # Rule 1: Hotspot (High Complexity + High Churn)
+        if config.is_rule_enabled("hotspot"):
+            hotspot_complexity = config.get_threshold("hotspot", "complexity")
+            hotspot_churn = config.get_threshold("hotspot", "churn")
+            hotspot_severity = config.get_severity("hotspot")
+            hotspot_explanation = (
+                f"This file has both high complexity AND high churn, making it a major stability risk. "
+                f"Thresholds: complexity > {hotspot_complexity}, churn > {hotspot_churn}"
+            )
+
+            def hotspot(path: str, file: Dict[str, Any], churn: int) -> Optional[RiskItem]:
+                complexity = file.get('complexity', 0)
+                if complexity > hotspot_complexity and churn > hotspot_churn:
+                    return _risk_item(
                         rule_type="Hotspot",
-                        severity=self.config.get_severity("hotspot"),
+                        severity=hotspot_severity,
                         file_path=path,
                         description=f"High complexity ({complexity}) combined with frequent changes ({churn} commits)",
-                        explanation=(
-                            f"This file has both high complexity AND high churn, making it a major stability risk. "
-                            f"Thresholds: complexity > {complexity_threshold}, churn > {churn_threshold}"
-                        ),
+                        explanation=hotspot_explanation,
                         metrics={"complexity": complexity, "churn": churn}
-                    ))
-            
-            # Rule 2: Deep Nesting (Cognitive Load)
-            if self.config.is_rule_enabled("deep_nesting"):
-                indent_threshold = self.config.get_threshold("deep_nesting", "indent_depth")
-                
+                    )
+                return None
+
+            rules.append(hotspot)
+
+        # Rule 2: Deep Nesting (Cognitive Load)
+        if config.is_rule_enabled("deep_nesting"):
+            indent_threshold = config.get_threshold("deep_nesting", "indent_depth")
+            nesting_severity = config.get_severity("deep_nesting")
+            nesting_explanation = (
+                f"Deep nesting reduces code readability and increases cognitive load. "
+                f"Threshold: indent_depth > {indent_threshold}"
+            )
+
+            def deep_nesting(path: str, file: Dict[str, Any], churn: int) -> Optional[RiskItem]:
+                indent = file.get('indent_depth', 0)
                 if indent > indent_threshold:
-                    findings.append(RiskItem(
-                        id=str(uuid.uuid4()),
+                    return _risk_item(
                         rule_type="Deep Nesting",
-                        severity=self.config.get_severity("deep_nesting"),
+                        severity=nesting_severity,
                         file_path=path,
                         description=f"Indentation depth of {indent} makes code hard to read and test",
-                        explanation=(
-                            f"Deep nesting reduces code readability and increases cognitive load. "
-                            f"Threshold: indent_depth > {indent_threshold}"
-                        ),
+                        explanation=nesting_explanation,
                         metrics={"indent_depth": indent}
-                    ))
-            
-            # Rule 3: Large File (Monolith)
-            if self.config.is_rule_enabled("large_file"):
-                loc_threshold = self.config.get_threshold("large_file", "loc")
-                
+                    )
+                return None
+
+            rules.append(deep_nesting)
+
+        # Rule 3: Large File (Monolith)
+        if config.is_rule_enabled("large_file"):
+            loc_threshold = config.get_threshold("large_file", "loc")
+            large_file_severity = config.get_severity("large_file")
+            large_file_explanation = (
+                f"Large files often indicate violation of Single Responsibility Principle. "
+                f"Threshold: loc > {loc_threshold}"
+            )
+
+            def large_file(path: str, file: Dict[str, Any], churn: int) -> Optional[RiskItem]:
+                loc = file.get('loc', 0)
                 if loc > loc_threshold:
-                    findings.append(RiskItem(
-                        id=str(uuid.uuid4()),
+                    return _risk_item(
                         rule_type="Large File",
-                        severity=self.config.get_severity("large_file"),
+                        severity=large_file_severity,
                         file_path=path,
                         description=f"File size of {loc} lines suggests too many responsibilities",
-                        explanation=(
-                            f"Large files often indicate violation of Single Responsibility Principle. "
-                            f"Threshold: loc > {loc_threshold}"
-                        ),
+                        explanation=large_file_explanation,
                         metrics={"loc": loc}
-                    ))
-            
-            # Rule 4: Complex Module (High Complexity without Churn)
-            if self.config.is_rule_enabled("complex_module"):
-                complexity_threshold = self.config.get_threshold("complex_module", "complexity")
-                
-                if complexity > complexity_threshold:
-                    findings.append(RiskItem(
-                        id=str(uuid.uuid4()),
+                    )
+                return None
+
+            rules.append(large_file)
+
+        # Rule 4: Complex Module (High Complexity without Churn)
+        if config.is_rule_enabled("complex_module"):
+            module_complexity = config.get_threshold("complex_module", "complexity")
+            complex_module_severity = config.get_severity("complex_module")
+            complex_module_explanation = (
+                f"High complexity makes code harder to understand, test, and maintain. "
+                f"Threshold: complexity > {module_complexity}"
+            )
+
+            def complex_module(path: str, file: Dict[str, Any], churn: int) -> Optional[RiskItem]:
+                complexity = file.get('complexity', 0)
+                if complexity > module_complexity:
+                    return _risk_item(
                         rule_type="Complex Module",
-                        severity=self.config.get_severity("complex_module"),
+                        severity=complex_module_severity,
                         file_path=path,
                         description=f"Cyclomatic complexity of {complexity} is very high",
-                        explanation=(
-                            f"High complexity makes code harder to understand, test, and maintain. "
-                            f"Threshold: complexity > {complexity_threshold}"
-                        ),
+                        explanation=complex_module_explanation,
                         metrics={"complexity": complexity}
-                    ))
-            
-            # Rule 5: No Tests (V2 Feature)
-            if self.config.is_rule_enabled("no_tests"):
-                min_loc = self.config.get_threshold("no_tests", "min_loc")
-                
+                    )
+                return None
+
+            rules.append(complex_module)
+
+        # Rule 5: No Tests (V2 Feature)
+        if config.is_rule_enabled("no_tests"):
+            min_loc = config.get_threshold("no_tests", "min_loc")
+            no_tests_severity = config.get_severity("no_tests")
+            no_tests_explanation = (
+                f"Substantial files without tests are risky and harder to refactor safely. "
+                f"Threshold: loc > {min_loc} without tests"
+            )
+
+            def no_tests(path: str, file: Dict[str, Any], churn: int) -> Optional[RiskItem]:
+                loc = file.get('loc', 0)
                 if loc > min_loc and not file.get('has_test', False):
-                    findings.append(RiskItem(
-                        id=str(uuid.uuid4()),
+                    return _risk_item(
                         rule_type="No Tests",
-                        severity=self.config.get_severity("no_tests"),
+                        severity=no_tests_severity,
                         file_path=path,
                         description=f"File has {loc} lines but no test coverage detected",
-                        explanation=(
-                            f"Substantial files without tests are risky and harder to refactor safely. "
-                            f"Threshold: loc > {min_loc} without tests"
-                        ),
+                        explanation=no_tests_explanation,
                         metrics={"loc": loc, "has_test": False}
-                    ))
-        
+                    )
+                return None
+
+            rules.append(no_tests)
+
+        return rules
+
+    def analyze(self, file_metrics: List[Dict[str, Any]], churn_metrics: Dict[str, int]) -> List[RiskItem]:
+        """
+        Analyze metrics using configured rules and thresholds.
+        Returns deterministic findings based on hard rules.
+        """
+        findings = []
+        rules = self._rules
+
+        for file in file_metrics:
+            path = file['path']
+
+            # Skip test files - we don't want to audit tests themselves
+            if _TEST_PATH_RE.search(path):
+                continue
+
+            churn = churn_metrics.get(path, 0)
+            for rule in rules:
+                finding = rule(path, file, churn)
+                if finding is not None:
+                    findings.append(finding)
+
         return findings
 
 # Default instance uses default config (V1 behavior)
@@ -2,11 +2,14 @@ import os
 import shutil
 import subprocess
 import asyncio
+import heapq
 import logging
 import httpx
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import Counter
-from typing import Dict, List, Any
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Set, Tuple
 from pathlib import Path
 from beanie import PydanticObjectId
 from groq import AsyncGroq
@@ -16,11 +19,52 @@ from app.models.repo import Repo
 from app.core.config import get_settings
 from app.services.audit.risk_engine import risk_engine
 from app.services.audit.ai_audit import AuditAI
+from app.services.audit.file_walker import CODE_EXTS, TEST_FILE_PATTERNS, walk_files
+from app.services.audit.metric_computer import analyze_source_file
+from app.services.audit.process_pool import map_in_pool
 
 settings = get_settings()
 
 logger = logging.getLogger(__name__)
 
+# Source files above this size (generated bundles, vendored libs) are not analyzed
+MAX_SOURCE_FILE_SIZE = 2_000_000
+
+# Affixes stripped from a test file's stem to get the module it covers;
+# at most one of each is stripped, so longer affixes come first
+TEST_FILE_PREFIXES = ('tests_', 'test_')
+TEST_FILE_SUFFIXES = ('_tests', '_test', '_spec', '.test', '.spec', 'tests', 'test', 'spec')
+
+# Read buffer for inflating downloaded zipballs
+ZIP_READ_BUFFER_SIZE = 256 << 10
+
+# V1 per-finding score deductions (see calculate_score)
+V1_SEVERITY_DEDUCTIONS = {"critical": 15, "high": 10, "medium": 5, "low": 2}
+
+@lru_cache(maxsize=256)
+def _owner_repo(repo_url: str) -> Tuple[str, str]:
+    """Split https://github.com/owner/repo into (owner, repo)."""
+    parts = repo_url.strip("/").split("/")
+    return parts[-2], parts[-1]
+
+
+def _test_subject(test_file: str) -> str:
+    """
+    Stem of the module a test file covers, lowercased
+    (test_foo.py, foo_tests.py, foo.spec.ts, FooTests.java -> "foo").
+    """
+    stem = Path(test_file).stem.lower()
+    for prefix in TEST_FILE_PREFIXES:
+        if stem.startswith(prefix):
+            stem = stem[len(prefix):]
+            break
+    for suffix in TEST_FILE_SUFFIXES:
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+            break
+    return stem.rstrip('_.')
+
+
 def calculate_score(findings: List) -> int:
     """
     Calculate audit score from findings using V1 deterministic algorithm.
@@ -40,20 +84,23 @@ def calculate_score(findings: List) -> int:
     Returns:
         int: Score between 0-100
     """
-    score = 100
-    for risk in findings:
-        if risk.severity == "critical": 
-            score -= 15
-        elif risk.severity == "high": 
-            score -= 10
-        elif risk.severity == "medium": 
-            score -= 5
-        elif risk.severity == "low": 
-            score -= 2
+    counts = Counter(risk.severity for risk in findings)
+    score = 100 - sum(V1_SEVERITY_DEDUCTIONS.get(severity, 0) * n for severity, n in counts.items())
     return max(0, score)  # Clamp to 0
 
 
 class AuditScanner:
+    # Result fields copied from a cached scan of the same commit
+    REUSED_FIELDS = (
+        "overall_score", "risk_level", "categories", "findings",
+        "lines_of_code", "summary", "report", "raw_metrics"
+    )
+    # Max in-flight GitHub requests while computing churn
+    CHURN_CONCURRENCY = 8
+    # Scans run as in-process tasks, so a restart cuts them off; one still
+    # pending/processing this long after starting is treated as interrupted
+    STALE_SCAN_AGE = timedelta(hours=1)
+
     def __init__(self):
         self.temp_dir = Path("/tmp/revflo_scans")
         if os.name == 'nt':
@@ -62,19 +109,83 @@ class AuditScanner:
         # Initialize AI Service
         self.groq_client = AsyncGroq(api_key=settings.groq_api_key)
         self.ai_service = AuditAI(self.groq_client)
+        # One pooled client for all GitHub calls, so a scan reuses its
+        # keep-alive connections instead of a fresh TLS handshake per call
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # Strong references to running scan tasks (the loop only keeps weak ones)
+        self._scan_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=16)
+            )
+        return self._http_client
+
+    async def aclose(self):
+        """Close the shared client (application shutdown)."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
 
     async def trigger_scan(self, repo_id: PydanticObjectId, repo_url: str, token: str) -> ScanResult:
         scan = ScanResult(repo_id=repo_id, status="pending")
         await scan.save()
-        asyncio.create_task(self._process_scan(scan, repo_url, token))
+        task = asyncio.create_task(self._process_scan(scan, repo_url, token))
+        self._scan_tasks.add(task)
+        task.add_done_callback(self._scan_tasks.discard)
         return scan
 
+    async def fail_interrupted_scans(self) -> int:
+        """
+        Mark scans orphaned by a restart as failed (startup).
+        
+        The GitHub token a scan runs with is only held in memory, so an
+        interrupted scan can't be resumed; failing it lets clients stop
+        polling and re-run it. Only scans older than STALE_SCAN_AGE are
+        touched, so scans still running in another instance (rolling deploy)
+        are left alone.
+        """
+        now = datetime.utcnow()
+        result = await ScanResult.get_motor_collection().update_many(
+            {
+                "status": {"$in": ["pending", "processing"]},
+                "started_at": {"$lt": now - self.STALE_SCAN_AGE}
+            },
+            {"$set": {
+                "status": "failed",
+                "error_message": "Scan was interrupted by a server restart. Please run it again.",
+                "completed_at": now
+            }}
+        )
+        if result.modified_count:
+            logger.warning(f"Marked {result.modified_count} interrupted scans as failed")
+        return result.modified_count
+
     async def _process_scan(self, scan: ScanResult, repo_url: str, token: str):
         scan_dir = self.temp_dir / str(scan.id)
         try:
             scan.status = "processing"
             await scan.save()
 
+            # Get commit SHA for cache invalidation (PRD 6.1 requirement)
+            scan.commit_sha = await self._fetch_head_sha(repo_url, token)
+
+            # HEAD unchanged since a completed scan by this engine: reuse it
+            # instead of downloading, re-scoring and re-explaining the repo
+            cached = await self._find_cached_scan(scan)
+            if cached:
+                logger.info(f"Reusing scan {cached.id} for {repo_url}@{scan.commit_sha}")
+                for field in self.REUSED_FIELDS:
+                    setattr(scan, field, getattr(cached, field))
+                scan.status = "completed"
+                scan.completed_at = datetime.utcnow()
+                await scan.save()
+                await self._update_repo_metadata(scan.repo_id, scan.id)
+                return
+
             # --- Stage 1: Clone & Index ---
             logger.info(f"Cloning {repo_url}")
             await self._clone_repo(repo_url, token, scan_dir)
@@ -86,22 +197,18 @@ class AuditScanner:
             config = RevFloConfig.from_file(scan_dir)
             logger.info(f"Loaded RevFlo config: {config.get_enabled_rules_count()} rules enabled")
             
-            file_stats = await self._index_files(scan_dir)
-            complexity_map = await self._calculate_complexity(scan_dir)
+            file_stats, complexity_map, test_files = await self._scan_tree(scan_dir)
             
-            # Calculate churn using GitHub API (V1 Bug Fix)
-            churn_map = await self._calculate_churn(repo_url, token, file_stats)
-            
-            # V2 Feature: Detect test coverage
-            test_coverage_map = await self._detect_test_coverage(scan_dir, file_stats)
+            # Churn (GitHub API round-trips) and test coverage (local walk) are
+            # independent, so the walk runs while churn requests are in flight
+            churn_map, test_coverage_map = await asyncio.gather(
+                self._calculate_churn(repo_url, token, file_stats),  # V1 Bug Fix
+                self._detect_test_coverage(test_files, file_stats)  # V2 Feature
+            )
 
             
-            # Enrich file_stats with complexity/metrics
+            # Enrich file_stats with test coverage (metrics come from _scan_tree)
             for stat in file_stats:
-                m = complexity_map.get(stat['path'], {})
-                stat['complexity'] = m.get('complexity', 0)
-                stat['loc'] = m.get('loc', 0)
-                stat['indent_depth'] = m.get('indent_depth', 0)
                 stat['has_test'] = test_coverage_map.get(stat['path'], False)  # V2: Test coverage
 
             # --- Stage 2: Risk Analysis (Deterministic with Custom Config) ---
@@ -165,25 +272,6 @@ class AuditScanner:
             scan.lines_of_code = total_loc
             
             
-            # Get commit SHA for cache invalidation (PRD 6.1 requirement)
-            try:
-                parts = repo_url.strip("/").split("/")
-                owner, repo_name = parts[-2], parts[-1]
-                from app.services.github import github_service
-                async with httpx.AsyncClient(
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Accept": "application/vnd.github+json"
-                    },
-                    timeout=10.0
-                ) as client:
-                    resp = await client.get(f"https://api.github.com/repos/{owner}/{repo_name}/commits/HEAD")
-                    if resp.status_code == 200:
-                        commit_data = resp.json()
-                        scan.commit_sha = commit_data.get("sha", "")[:7]  # Short SHA
-            except Exception as e:
-                logger.warning(f"Could not fetch commit SHA: {e}")
-            
             scan.status = "completed"
             scan.completed_at = datetime.utcnow()
             await scan.save()
@@ -202,153 +290,142 @@ class AuditScanner:
                     def remove_readonly(func, path, excinfo):
                         os.chmod(path, 0o777)
                         func(path)
-                    shutil.rmtree(scan_dir, onerror=remove_readonly)
+                    # Thousands of unlink/rmdir syscalls: keep them off the event loop
+                    await asyncio.to_thread(shutil.rmtree, scan_dir, onerror=remove_readonly)
                 except Exception:
                     pass
 
+    async def _fetch_head_sha(self, repo_url: str, token: str) -> Optional[str]:
+        """Short SHA of the default branch HEAD, or None if it can't be fetched."""
+        try:
+            owner, repo_name = _owner_repo(repo_url)
+            resp = await self.http_client.get(
+                f"https://api.github.com/repos/{owner}/{repo_name}/commits/HEAD",
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Accept": "application/vnd.github+json"
+                },
+                timeout=10.0
+            )
+            if resp.status_code == 200:
+                commit_data = resp.json()
+                return commit_data.get("sha", "")[:7] or None  # Short SHA
+        except Exception as e:
+            logger.warning(f"Could not fetch commit SHA: {e}")
+        return None
+
+    async def _find_cached_scan(self, scan: ScanResult) -> Optional[ScanResult]:
+        """Latest completed scan of the same repo, commit and engine version."""
+        if not scan.commit_sha:
+            return None
+        return await ScanResult.find(
+            ScanResult.repo_id == scan.repo_id,
+            ScanResult.commit_sha == scan.commit_sha,
+            ScanResult.engine_version == scan.engine_version,
+            ScanResult.status == "completed"
+        ).sort("-completed_at").first_or_none()
+
     async def _clone_repo(self, repo_url: str, token: str, target_dir: Path):
         # Fallback to ZIP download if git is not available
-        import httpx
-        from io import BytesIO
+        import tempfile
         import zipfile
         
-        # repo_url format: https://github.com/owner/repo
-        parts = repo_url.strip("/").split("/")
-        owner, repo = parts[-2], parts[-1]
+        owner, repo = _owner_repo(repo_url)
         
         zip_url = f"https://api.github.com/repos/{owner}/{repo}/zipball"
         headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github.v3+json"}
         
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            resp = await client.get(zip_url, headers=headers)
-            if resp.status_code != 200:
-                raise Exception(f"Failed to download repo: {resp.status_code}")
+        # Stream the archive to a temp file on disk so memory stays O(1)
+        # instead of buffering the whole zipball
+        with tempfile.TemporaryFile() as tmp:
+            async with self.http_client.stream("GET", zip_url, headers=headers, follow_redirects=True) as resp:
+                if resp.status_code != 200:
+                    raise Exception(f"Failed to download repo: {resp.status_code}")
                 
-            with zipfile.ZipFile(BytesIO(resp.content)) as z:
-                z.extractall(target_dir)
+                async for chunk in resp.aiter_bytes(1 << 20):
+                    tmp.write(chunk)
+            
+            tmp.flush()
+            tmp.seek(0)
+            # ZipFile issues many small reads while inflating; read through a
+            # large buffer, and keep the extraction off the event loop
+            with open(tmp.fileno(), 'rb', buffering=ZIP_READ_BUFFER_SIZE, closefd=False) as bf:
+                def extract():
+                    with zipfile.ZipFile(bf) as z:
+                        z.extractall(target_dir)
+                await asyncio.to_thread(extract)
                 
         # GitHub zipballs extract to a root folder like 'user-repo-sha', move contents up if needed
         # Or just let indexing handle recursive structures (which it already does)
         return
 
-    async def _index_files(self, scan_dir: Path) -> List[Dict]:
-        stats = []
-        for root, _, files in os.walk(scan_dir):
-            # Skip .git directory
-            if ".git" in root:
-                continue
-            
-            # Skip test directories
-            root_lower = root.lower()
-            if any(pattern in root_lower for pattern in ['test', 'tests', '__test__', '__tests__', 'spec', 'specs']):
-                continue
-                
-            for file in files:
-                file_path = Path(root) / file
-                try:
-                    rel_path = str(file_path.relative_to(scan_dir)).replace('\\', '/')
-                    
-                    # Skip test files
-                    rel_path_lower = rel_path.lower()
-                    if any(pattern in rel_path_lower for pattern in ['test_', '_test.', 'test.', 'spec_', '_spec.', 'spec.']):
-                        continue
-                    
-                    stats.append({
-                        "path": rel_path,
-                        "size": file_path.stat().st_size,
-                        "ext": file_path.suffix
-                    })
-                except Exception:
-                    pass
-        return stats
-
-    async def _calculate_complexity(self, scan_dir: Path) -> Dict[str, Dict]:
+    async def _scan_tree(self, scan_dir: Path) -> Tuple[List[Dict], Dict[str, Dict], Set[str]]:
         """
-        V2 FEATURE: Calculate real cyclomatic complexity using Radon (Python).
+        Index the repository, compute source-file metrics and collect test
+        files in a single pass.
+        
+        The shared walk_files scandir walk caches each entry's stat() result.
+        V2 FEATURE: Real cyclomatic complexity using Radon (Python).
         V1 used proxy-based complexity (indentation heuristic).
         
-        Returns: Dict[path, {'complexity': int, 'loc': int, 'indent_depth': int}]
+        Returns: (file_stats, complexity_map, test_files) where file_stats
+        entries carry path/size/ext plus complexity/loc/indent_depth,
+        complexity_map is Dict[path, {'complexity': int, 'loc': int,
+        'indent_depth': int}] for analyzed source files, and test_files holds
+        the relative paths of test/spec files anywhere in the tree.
         """
-        metrics = {}
-        
-        for root, _, files in os.walk(scan_dir):
-            if ".git" in root:
-                continue
-            
-            # Skip test directories
-            root_lower = root.lower()
-            if any(pattern in root_lower for pattern in ['test', 'tests', '__test__', '__tests__', 'spec', 'specs']):
-                continue
+        stats = []
+        sources = []
+        test_files = set()
+        for entry, rel_path, in_test_dir in walk_files(scan_dir):
+            try:
+                # V2: Test files, for coverage detection
+                name_lower = entry.name.lower()
+                if 'test' in name_lower or 'spec' in name_lower:
+                    test_files.add(rel_path)
+                
+                # Test directories only contribute test files, not file stats
+                if in_test_dir:
+                    continue
+                
+                # Skip test files
+                rel_path_lower = rel_path.lower()
+                if any(pattern in rel_path_lower for pattern in TEST_FILE_PATTERNS):
+                    continue
                 
-            for file in files:
-                if file.endswith(('.py', '.js', '.ts', '.java', '.cpp', '.tsx', '.jsx')):
-                    try:
-                        path = Path(root) / file
-                        rel_path = str(path.relative_to(scan_dir)).replace('\\', '/')
-                        
-                        # Skip test files
-                        rel_path_lower = rel_path.lower()
-                        if any(pattern in rel_path_lower for pattern in ['test_', '_test.', 'test.', 'spec_', '_spec.', 'spec.']):
-                            continue
-                        
-                        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            lines = content.splitlines()
-                        
-                        # Calculate LOC (non-empty, non-comment lines)
-                        loc = len([l for l in lines if l.strip() and not l.strip().startswith('#')])
-                        
-                        # Calculate indent depth (max indentation)
-                        indent_depth = 0
-                        for line in lines:
-                            if line.strip():
-                                stripped = line.lstrip()
-                                indent = len(line) - len(stripped)
-                                spaces = indent // 4  # Assuming 4-space indents
-                                indent_depth = max(indent_depth, spaces)
-                        
-                        # V2: Real cyclomatic complexity for Python files
-                        complexity = 0
-                        if file.endswith('.py'):
-                            try:
-                                from radon.complexity import cc_visit
-                                complexity_results = cc_visit(content)
-                                # Sum complexity of all functions/methods
-                                complexity = sum(item.complexity for item in complexity_results)
-                            except Exception as e:
-                                logger.warning(f"Radon failed for {rel_path}, using proxy: {e}")
-                                # Fallback to proxy for Python if Radon fails
-                                complexity = self._proxy_complexity(lines)
-                        else:
-                            # V1 Proxy for non-Python files
-                            complexity = self._proxy_complexity(lines)
-                        
-                        metrics[rel_path] = {
-                            'complexity': complexity,
-                            'loc': loc,
-                            'indent_depth': indent_depth
-                        }
-                    except Exception as e:
-                        logger.warning(f"Failed to analyze {file}: {e}")
-                        pass
+                size = entry.stat().st_size
+                ext = os.path.splitext(entry.name)[1]
+                stat = {
+                    "path": rel_path,
+                    "size": size,
+                    "ext": ext,
+                    "complexity": 0,
+                    "loc": 0,
+                    "indent_depth": 0
+                }
+                stats.append(stat)
+                
+                if ext in CODE_EXTS and size <= MAX_SOURCE_FILE_SIZE:
+                    sources.append((Path(entry.path), rel_path, stat))
+            except Exception:
+                pass
         
-        return metrics
+        # Scoring (Radon + line scan) is CPU-bound, so fan it out across
+        # cores in the shared worker pool
+        results = await map_in_pool(
+            analyze_source_file,
+            [path for path, _, _ in sources],
+            [rel_path for _, rel_path, _ in sources]
+        )
+        
+        complexity_map = {}
+        for (_, rel_path, stat), metrics in zip(sources, results):
+            if metrics is not None:
+                complexity_map[rel_path] = metrics
+                stat.update(metrics)
+        
+        return stats, complexity_map, test_files
     
-    def _proxy_complexity(self, lines: List[str]) -> int:
-        """
-        V1 proxy complexity (fallback for non-Python or Radon failures).
-        Counts deep nesting and long lines as complexity indicators.
-        """
-        score = 0
-        for line in lines:
-            stripped = line.lstrip()
-            indent = len(line) - len(stripped)
-            if indent >= 8:
-                score += 1  # Deep nesting
-            if len(line) > 120:
-                score += 0.5  # Long lines
-        return int(score)
-
     async def _extract_code_snippets(self, scan_dir: Path, complexity_map: Dict[str, int]) -> Dict[str, str]:
         """
         Extract code snippets for AI analysis.
@@ -357,27 +434,27 @@ class AuditScanner:
         snippets = {}
         
         # 1. Always try to get README (truncated)
+        # Open directly instead of exists() + open: one lookup per candidate.
+        # Snippets are read as raw bytes and only the capped slice is decoded
+        # (caps are in bytes, which also bounds the prompt more tightly)
         for readme_name in ["README.md", "readme.md", "README.txt"]:
-            readme_path = scan_dir / readme_name
-            if readme_path.exists():
-                try:
-                    with open(readme_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        snippets["README"] = f.read(1000)  # Reduced from 2000
-                    break
-                except:
-                    pass
+            try:
+                with open(scan_dir / readme_name, 'rb') as f:
+                    snippets["README"] = f.read(1000).decode('utf-8', errors='ignore')  # Reduced from 2000
+                break
+            except OSError:
+                pass
         
         # 2. Get top 2 most complex files (reduced from 3)
-        sorted_files = sorted(complexity_map.items(), key=lambda x: x[1], reverse=True)[:2]
-        for rel_path, score in sorted_files:
+        top_files = heapq.nlargest(2, complexity_map.items(), key=itemgetter(1))
+        for rel_path, score in top_files:
             try:
                 full_path = scan_dir / rel_path
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    # Reduced from 5000 chars / 150 lines to 3000 chars / 100 lines
-                    content = f.read(3000)
-                    lines = content.splitlines()[:100]
-                    snippets[rel_path] = "\n".join(lines)
-            except:
+                with open(full_path, 'rb') as f:
+                    # Reduced from 5000 chars / 150 lines to 3000 bytes / 100 lines
+                    content = f.read(3000).decode('utf-8', errors='ignore')
+                snippets[rel_path] = "\n".join(content.splitlines()[:100])
+            except OSError:
                 pass
             
         return snippets
@@ -394,37 +471,56 @@ class AuditScanner:
         """
         from app.services.github import github_service
         
-        # Extract owner/repo from URL
-        parts = repo_url.strip("/").split("/")
-        owner, repo = parts[-2], parts[-1]
-        
-        churn_map = {}
+        owner, repo = _owner_repo(repo_url)
         
         # To avoid API rate limits, only calculate churn for top complex files
         # or a sample of files (e.g., top 20 by size/complexity)
-        files_to_check = sorted(
-            [f for f in file_stats if f['path'].endswith(('.py', '.js', '.ts', '.java', '.cpp', '.tsx', '.jsx'))],
-            key=lambda x: x.get('size', 0),
-            reverse=True
-        )[:20]  # Top 20 largest code files
+        # Top 20 largest code files (partial selection, no full sort)
+        files_to_check = heapq.nlargest(
+            20,
+            (f for f in file_stats if f['ext'] in CODE_EXTS),
+            key=lambda x: x.get('size', 0)
+        )
         
         logger.info(f"Calculating churn for {len(files_to_check)} files...")
         
-        for file in files_to_check:
-            file_path = file['path']
-            try:
-                commit_count = await github_service.fetch_file_commits(
+        paths = [file['path'] for file in files_to_check]
+        
+        # One GraphQL request covers every file
+        churn_map = await github_service.fetch_files_commit_counts(
+            owner, repo, paths, token, since_days=90
+        )
+        if churn_map is not None:
+            return churn_map
+        
+        logger.warning("GraphQL churn query failed, falling back to per-file requests")
+        
+        # Requests run concurrently, capped to stay under GitHub's secondary rate limits
+        semaphore = asyncio.Semaphore(self.CHURN_CONCURRENCY)
+        
+        async def fetch_churn(file_path: str) -> int:
+            async with semaphore:
+                return await github_service.fetch_file_commits(
                     owner, repo, file_path, token, since_days=90
                 )
-                churn_map[file_path] = commit_count
-                logger.debug(f"Churn for {file_path}: {commit_count} commits")
-            except Exception as e:
-                logger.warning(f"Could not fetch churn for {file_path}: {e}")
+        
+        results = await asyncio.gather(
+            *(fetch_churn(file_path) for file_path in paths),
+            return_exceptions=True
+        )
+        
+        churn_map = {}
+        for file_path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not fetch churn for {file_path}: {result}")
                 churn_map[file_path] = 0  # Graceful degradation
+            else:
+                churn_map[file_path] = result
+                logger.debug(f"Churn for {file_path}: {result} commits")
         
         return churn_map
 
-    async def _detect_test_coverage(self, scan_dir: Path, file_stats: List[Dict]) -> Dict[str, bool]:
+    async def _detect_test_coverage(self, test_files: Set[str], file_stats: List[Dict]) -> Dict[str, bool]:
         """
         V2 FEATURE: Detect if source files have corresponding test files.
         
@@ -433,58 +529,37 @@ class AuditScanner:
         - JavaScript/TypeScript: *.test.js, *.spec.js, *.test.ts, *.spec.ts
         - Java: *Test.java, tests/*
         
+        test_files is collected by _scan_tree during the indexing walk.
+        
         Returns: Dict mapping file paths to boolean (has_test)
         """
-        # Collect all test files
-        test_files = set()
-        test_patterns = [
-            '*test*.py', '*spec*.py',
-            '*test*.js', '*spec*.js',
-            '*test*.ts', '*spec*.ts', '*test*.tsx', '*spec*.tsx',
-            '*Test.java', '*Tests.java'
-        ]
-        
-        for root, _, files in os.walk(scan_dir):
-            if ".git" in root or "node_modules" in root:
-                continue
-            for file in files:
-                file_lower = file.lower()
-                # Check if it's a test file
-                if any(pattern.replace('*', '') in file_lower for pattern in ['test', 'spec']):
-                    file_path = Path(root) / file
-                    try:
-                        rel_path = str(file_path.relative_to(scan_dir)).replace('\\', '/')
-                        test_files.add(rel_path)
-                    except:
-                        pass
-        
         logger.info(f"Found {len(test_files)} test files")
         
-        # Map source files to test coverage
+        # Matching runs off the event loop so churn requests keep progressing
+        return await asyncio.to_thread(self._map_test_coverage, test_files, file_stats)
+
+    def _map_test_coverage(self, test_files: Set[str], file_stats: List[Dict]) -> Dict[str, bool]:
+        """Map each source file to whether a corresponding test file exists."""
+        # Reduce every test file to the stem of the module it tests
+        # (test_foo.py, foo_test.py, foo.spec.ts, FooTest.java -> "foo") so
+        # each source file is a single set lookup instead of a scan of all tests
+        test_subjects = {_test_subject(test_file) for test_file in test_files}
+        
         coverage_map = {}
         for stat in file_stats:
             path = stat['path']
             
             # Skip if it's already a test file
-            if 'test' in path.lower() or 'spec' in path.lower():
+            path_lower = path.lower()
+            if 'test' in path_lower or 'spec' in path_lower:
                 continue
             
-            # Extract filename without extension
-            file_name = Path(path).stem
-            
-            # Check if there's a corresponding test file
-            has_test = any(
-                file_name in test_file or test_file in path
-                for test_file in test_files
-            )
-            
-            coverage_map[path] = has_test
+            coverage_map[path] = Path(path).stem.lower() in test_subjects
         
         return coverage_map
 
-
     def _get_language_breakdown(self, stats: List[Dict]) -> Dict[str, int]:
-        cnt = Counter([s['ext'] for s in stats])
+        cnt = Counter(s['ext'] for s in stats)
         return dict(cnt.most_common(5))
 
     async def _update_repo_metadata(self, repo_id: PydanticObjectId, scan_id: PydanticObjectId):
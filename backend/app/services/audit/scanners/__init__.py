@@ -2,6 +2,10 @@
 V3 Dimension Scanners Package
 Each dimension scanner is a separate module
 """
+import asyncio
+from typing import Dict, List, Sequence, Set, Union
+from app.models.audit_v3 import DimensionScanResult
+from app.services.audit.dimension_scanner import DimensionScanner, RepoContext, FileMetrics
 from app.services.audit.scanners.code_quality_scanner import CodeQualityScanner
 from app.services.audit.scanners.maintainability_scanner import MaintainabilityScanner
 from app.services.audit.scanners.testing_confidence_scanner import TestingConfidenceScanner
@@ -15,5 +19,24 @@ __all__ = [
     "TestingConfidenceScanner",
     "ArchitectureScanner",
     "PerformanceScanner",
-    "SecurityScanner"
+    "SecurityScanner",
+    "run_all"
 ]
+
+
+async def run_all(
+    scanners: Sequence[DimensionScanner],
+    repo_context: RepoContext,
+    changed_files: Set[str],
+    metric_cache: Dict[str, FileMetrics]
+) -> List[Union[DimensionScanResult, BaseException]]:
+    """
+    Run dimension scanners concurrently over the shared metric cache.
+    
+    Results come back in scanner order; a scanner that raised yields its
+    exception in place of a result, so one failure doesn't cancel the rest.
+    """
+    return await asyncio.gather(
+        *(scanner.scan(repo_context, changed_files, metric_cache) for scanner in scanners),
+        return_exceptions=True
+    )
@@ -6,6 +6,7 @@ Rules:
 - Deep Nesting: Excessive indentation (from V2)
 """
 import logging
+import time
 from typing import Set, Dict, List
 from datetime import datetime
 from app.models.audit_v3 import DimensionScanResult, Finding
@@ -41,6 +42,7 @@ class ArchitectureScanner(DimensionScanner):
     ) -> DimensionScanResult:
         """Run architecture scan."""
         logger.info(f"Starting Architecture scan for {repo_context.repo_id}")
+        start_ns = time.perf_counter_ns()  # Monotonic, for duration_ms
         
         scan_result = DimensionScanResult(
             audit_run_id=repo_context.repo_id,
@@ -50,29 +52,30 @@ class ArchitectureScanner(DimensionScanner):
             started_at=datetime.utcnow()
         )
         
-        findings: List[Finding] = []
-        files_analyzed = 0
-        files_from_cache = 0
+        # Every file comes from the orchestrator-provided metric cache
+        files_analyzed = len(metric_cache)
+        files_from_cache = files_analyzed
         
-        for file_path, metrics in metric_cache.items():
-            files_analyzed += 1
-            files_from_cache += 1
-            
-            # Rule 1: Deep Nesting
-            if metrics.indent_depth > self.DEEP_NESTING_THRESHOLD:
-                findings.append(Finding(
-                    id=f"ARCH001-{file_path}",
-                    rule_id="ARCH001",
-                    severity="medium",
-                    category="deep_nesting",
-                    file_path=file_path,
-                    title="Deep Nesting",
-                    description=f"Deep nesting (indent depth: {metrics.indent_depth}) reduces readability and testability",
-                    metrics={
-                        "indent_depth": metrics.indent_depth,
-                        "threshold": self.DEEP_NESTING_THRESHOLD
-                    }
-                ))
+        # Rule 1: Deep Nesting
+        # Threshold bound once; Finding objects are only built for matches
+        threshold = self.DEEP_NESTING_THRESHOLD
+        findings: List[Finding] = [
+            Finding.model_construct(
+                id=f"ARCH001-{file_path}",
+                rule_id="ARCH001",
+                severity="medium",
+                category="deep_nesting",
+                file_path=file_path,
+                title="Deep Nesting",
+                description=f"Deep nesting (indent depth: {metrics.indent_depth}) reduces readability and testability",
+                metrics={
+                    "indent_depth": metrics.indent_depth,
+                    "threshold": threshold
+                }
+            )
+            for file_path, metrics in metric_cache.items()
+            if metrics.indent_depth > threshold
+        ]
         
         # Calculate score
         score = self.calculate_score(findings)
@@ -89,28 +92,10 @@ class ArchitectureScanner(DimensionScanner):
         scan_result.status = "completed"
         scan_result.completed_at = datetime.utcnow()
         
-        if scan_result.started_at and scan_result.completed_at:
-            duration = scan_result.completed_at - scan_result.started_at
-            scan_result.duration_ms = int(duration.total_seconds() * 1000)
+        scan_result.duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         logger.info(
             f"Architecture scan completed: score={score}, findings={len(findings)}"
         )
         
         return scan_result
-    
-    def calculate_score(self, findings: List[Finding]) -> int:
-        """Calculate architecture score."""
-        score = 100
-        
-        for finding in findings:
-            if finding.severity == "critical":
-                score -= 20
-            elif finding.severity == "high":
-                score -= 10
-            elif finding.severity == "medium":
-                score -= 5
-            elif finding.severity == "low":
-                score -= 2
-        
-        return max(0, score)
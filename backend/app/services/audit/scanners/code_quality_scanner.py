@@ -10,6 +10,8 @@ Detects:
 Phase 2: Initial implementation with V2 rule extraction
 """
 import logging
+import time
+from collections import Counter
 from typing import Set, Dict, List
 from datetime import datetime
 from app.models.audit_v3 import DimensionScanResult, Finding
@@ -51,6 +53,7 @@ class CodeQualityScanner(DimensionScanner):
         Phase 2: Analyzes all files (incremental support in Phase 4)
         """
         logger.info(f"Starting Code Quality scan for {repo_context.repo_id}")
+        start_ns = time.perf_counter_ns()  # Monotonic, for duration_ms
         
         # Create scan result
         scan_result = DimensionScanResult(
@@ -62,66 +65,70 @@ class CodeQualityScanner(DimensionScanner):
         )
         
         findings: List[Finding] = []
-        files_analyzed = 0
-        files_from_cache = 0
+        # Every file comes from the orchestrator-provided metric cache
+        files_analyzed = len(metric_cache)
+        files_from_cache = files_analyzed
+        
+        # Thresholds and append bound once, outside the per-file loop
+        large_file_loc = self.LARGE_FILE_LOC
+        complex_module_complexity = self.COMPLEX_MODULE_COMPLEXITY
+        add_finding = findings.append
         
         # Analyze all files in cache
         for file_path, metrics in metric_cache.items():
-            files_analyzed += 1
-            files_from_cache += 1  # Phase 2: all from cache (orchestrator provides)
-            
             # Rule 1: Large File
-            if metrics.loc > self.LARGE_FILE_LOC:
-                findings.append(Finding(
+            if metrics.loc > large_file_loc:
+                add_finding(Finding.model_construct(
                     id=f"QUAL001-{file_path}",
                     rule_id="QUAL001",
                     severity="medium",
                     category="large_file",
                     file_path=file_path,
                     title="Large File",
-                    description=f"File has {metrics.loc} lines, suggesting too many responsibilities (threshold: {self.LARGE_FILE_LOC})",
+                    description=f"File has {metrics.loc} lines, suggesting too many responsibilities (threshold: {large_file_loc})",
                     metrics={
                         "loc": metrics.loc,
-                        "threshold": self.LARGE_FILE_LOC
+                        "threshold": large_file_loc
                     }
                 ))
             
             # Rule 2: Complex Module
-            if metrics.complexity > self.COMPLEX_MODULE_COMPLEXITY:
-                findings.append(Finding(
+            if metrics.complexity > complex_module_complexity:
+                add_finding(Finding.model_construct(
                     id=f"QUAL002-{file_path}",
                     rule_id="QUAL002",
                     severity="medium",
                     category="complex_module",
                     file_path=file_path,
                     title="Complex Module",
-                    description=f"High cyclomatic complexity ({metrics.complexity}) makes this module hard to maintain (threshold: {self.COMPLEX_MODULE_COMPLEXITY})",
+                    description=f"High cyclomatic complexity ({metrics.complexity}) makes this module hard to maintain (threshold: {complex_module_complexity})",
                     metrics={
                         "complexity": metrics.complexity,
-                        "threshold": self.COMPLEX_MODULE_COMPLEXITY
+                        "threshold": complex_module_complexity
                     }
                 ))
         
         # Calculate score (deterministic)
         score = self.calculate_score(findings)
         
+        # Findings per rule, counted in one pass
+        rule_counts = Counter(f.rule_id for f in findings)
+        
         # Update scan result
         scan_result.score = score
         scan_result.findings = findings
         scan_result.files_analyzed = files_analyzed
         scan_result.files_from_cache = files_from_cache
         scan_result.metrics = {
-            "large_file_count": len([f for f in findings if f.rule_id == "QUAL001"]),
-            "complex_module_count": len([f for f in findings if f.rule_id == "QUAL002"]),
+            "large_file_count": rule_counts["QUAL001"],
+            "complex_module_count": rule_counts["QUAL002"],
             "total_findings": len(findings)
         }
         scan_result.status = "completed"
         scan_result.completed_at = datetime.utcnow()
         
         # Calculate duration
-        if scan_result.started_at and scan_result.completed_at:
-            duration = scan_result.completed_at - scan_result.started_at
-            scan_result.duration_ms = int(duration.total_seconds() * 1000)
+        scan_result.duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         logger.info(
             f"Code Quality scan completed: score={score}, "
@@ -145,26 +152,3 @@ class CodeQualityScanner(DimensionScanner):
                 logger.warning(f"AI explanation failed: {e}")
         
         return scan_result
-    
-    def calculate_score(self, findings: List[Finding]) -> int:
-        """
-        Calculate code quality score from findings.
-        
-        Deterministic algorithm:
-        - Start at 100
-        - Deduct 5 points per medium severity finding
-        - Floor at 0
-        """
-        score = 100
-        
-        for finding in findings:
-            if finding.severity == "critical":
-                score -= 20
-            elif finding.severity == "high":
-                score -= 10
-            elif finding.severity == "medium":
-                score -= 5
-            elif finding.severity == "low":
-                score -= 2
-        
-        return max(0, score)
@@ -7,6 +7,7 @@ Rules:
 - Future: Coupling analysis, documentation coverage
 """
 import logging
+import time
 from typing import Set, Dict, List
 from datetime import datetime
 from app.models.audit_v3 import DimensionScanResult, Finding
@@ -43,6 +44,7 @@ class MaintainabilityScanner(DimensionScanner):
     ) -> DimensionScanResult:
         """Run maintainability scan."""
         logger.info(f"Starting Maintainability scan for {repo_context.repo_id}")
+        start_ns = time.perf_counter_ns()  # Monotonic, for duration_ms
         
         scan_result = DimensionScanResult(
             audit_run_id=repo_context.repo_id,
@@ -52,31 +54,33 @@ class MaintainabilityScanner(DimensionScanner):
             started_at=datetime.utcnow()
         )
         
-        findings: List[Finding] = []
-        files_analyzed = 0
-        files_from_cache = 0
+        # Every file comes from the orchestrator-provided metric cache
+        files_analyzed = len(metric_cache)
+        files_from_cache = files_analyzed
         
-        for file_path, metrics in metric_cache.items():
-            files_analyzed += 1
-            files_from_cache += 1
-            
-            # Rule 1: Hotspot (high complexity + high churn)
-            if metrics.complexity > self.HOTSPOT_COMPLEXITY and metrics.churn_90d > self.HOTSPOT_CHURN:
-                findings.append(Finding(
-                    id=f"MAINT001-{file_path}",
-                    rule_id="MAINT001",
-                    severity="high",
-                    category="hotspot",
-                    file_path=file_path,
-                    title="Hotspot",
-                    description=f"High complexity ({metrics.complexity}) + frequent changes ({metrics.churn_90d} commits) = instability risk",
-                    metrics={
-                        "complexity": metrics.complexity,
-                        "churn_90d": metrics.churn_90d,
-                        "complexity_threshold": self.HOTSPOT_COMPLEXITY,
-                        "churn_threshold": self.HOTSPOT_CHURN
-                    }
-                ))
+        # Rule 1: Hotspot (high complexity + high churn)
+        # Thresholds bound once; Finding objects are only built for matches
+        complexity_threshold = self.HOTSPOT_COMPLEXITY
+        churn_threshold = self.HOTSPOT_CHURN
+        findings: List[Finding] = [
+            Finding.model_construct(
+                id=f"MAINT001-{file_path}",
+                rule_id="MAINT001",
+                severity="high",
+                category="hotspot",
+                file_path=file_path,
+                title="Hotspot",
+                description=f"High complexity ({metrics.complexity}) + frequent changes ({metrics.churn_90d} commits) = instability risk",
+                metrics={
+                    "complexity": metrics.complexity,
+                    "churn_90d": metrics.churn_90d,
+                    "complexity_threshold": complexity_threshold,
+                    "churn_threshold": churn_threshold
+                }
+            )
+            for file_path, metrics in metric_cache.items()
+            if metrics.complexity > complexity_threshold and metrics.churn_90d > churn_threshold
+        ]
         
         # Calculate score
         score = self.calculate_score(findings)
@@ -93,28 +97,10 @@ class MaintainabilityScanner(DimensionScanner):
         scan_result.status = "completed"
         scan_result.completed_at = datetime.utcnow()
         
-        if scan_result.started_at and scan_result.completed_at:
-            duration = scan_result.completed_at - scan_result.started_at
-            scan_result.duration_ms = int(duration.total_seconds() * 1000)
+        scan_result.duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         logger.info(
             f"Maintainability scan completed: score={score}, findings={len(findings)}"
         )
         
         return scan_result
-    
-    def calculate_score(self, findings: List[Finding]) -> int:
-        """Calculate maintainability score."""
-        score = 100
-        
-        for finding in findings:
-            if finding.severity == "critical":
-                score -= 20
-            elif finding.severity == "high":
-                score -= 10
-            elif finding.severity == "medium":
-                score -= 5
-            elif finding.severity == "low":
-                score -= 2
-        
-        return max(0, score)
@@ -7,9 +7,10 @@ Rules:
 - Future: Hardcoded secrets, SQL injection, dependency vulnerabilities
 """
 import logging
-from typing import Set, Dict, List
+import time
+from typing import Set, Dict
 from datetime import datetime
-from app.models.audit_v3 import DimensionScanResult, Finding
+from app.models.audit_v3 import DimensionScanResult
 from app.services.audit.dimension_scanner import (
     DimensionScanner,
     RepoContext,
@@ -39,61 +40,28 @@ class SecurityScanner(DimensionScanner):
     ) -> DimensionScanResult:
         """Run security scan."""
         logger.info(f"Starting Security scan for {repo_context.repo_id}")
+        start_ns = time.perf_counter_ns()  # Monotonic, for duration_ms
         
-        scan_result = DimensionScanResult(
-            audit_run_id=repo_context.repo_id,
-            repo_id=repo_context.repo_id,
-            scan_type="security",
-            status="running",
-            started_at=datetime.utcnow()
-        )
-        
-        findings: List[Finding] = []
-        files_analyzed = len(metric_cache)
-        
-        # Phase 3: No security rules yet - placeholder
-        # Future: Add detection for:
+        # Phase 3: No security rules yet, so the result is a completed,
+        # perfect-score placeholder. Future: Add detection for:
         # - Hardcoded secrets/API keys
         # - SQL injection patterns
         # - XSS vulnerabilities
         # - Dependency vulnerabilities (npm audit, pip-audit)
-        
-        # Calculate score (100 if no issues)
-        score = self.calculate_score(findings)
-        
-        # Update scan result
-        scan_result.score = score
-        scan_result.findings = findings
-        scan_result.files_analyzed = files_analyzed
-        scan_result.files_from_cache = files_analyzed
-        scan_result.metrics = {
-            "total_findings": len(findings)
-        }
-        scan_result.status = "completed"
-        scan_result.completed_at = datetime.utcnow()
-        
-        if scan_result.started_at and scan_result.completed_at:
-            duration = scan_result.completed_at - scan_result.started_at
-            scan_result.duration_ms = int(duration.total_seconds() * 1000)
-        
-        logger.info(
-            f"Security scan completed: score={score} (placeholder - no rules yet)"
+        now = datetime.utcnow()
+        files_analyzed = len(metric_cache)
+        logger.info("Security scan completed: score=100 (placeholder - no rules yet)")
+        return DimensionScanResult(
+            audit_run_id=repo_context.repo_id,
+            repo_id=repo_context.repo_id,
+            scan_type="security",
+            status="completed",
+            score=100,
+            findings=[],
+            files_analyzed=files_analyzed,
+            files_from_cache=files_analyzed,
+            metrics={"total_findings": 0},
+            started_at=now,
+            completed_at=now,
+            duration_ms=(time.perf_counter_ns() - start_ns) // 1_000_000
         )
-        
-        return scan_result
-    
-    def calculate_score(self, findings: List[Finding]) -> int:
-        """Calculate security score."""
-        score = 100
-        
-        for finding in findings:
-            if finding.severity == "critical":
-                score -= 20
-            elif finding.severity == "high":
-                score -= 10
-            elif finding.severity == "medium":
-                score -= 5
-            elif finding.severity == "low":
-                score -= 2
-        
-        return max(0, score)
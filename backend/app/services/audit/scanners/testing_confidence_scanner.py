@@ -6,6 +6,7 @@ Rules:
 - No Tests: Substantial files without tests (from V2)
 """
 import logging
+import time
 from typing import Set, Dict, List
 from datetime import datetime
 from app.models.audit_v3 import DimensionScanResult, Finding
@@ -41,6 +42,7 @@ class TestingConfidenceScanner(DimensionScanner):
     ) -> DimensionScanResult:
         """Run testing confidence scan."""
         logger.info(f"Starting Testing Confidence scan for {repo_context.repo_id}")
+        start_ns = time.perf_counter_ns()  # Monotonic, for duration_ms
         
         scan_result = DimensionScanResult(
             audit_run_id=repo_context.repo_id,
@@ -51,20 +53,23 @@ class TestingConfidenceScanner(DimensionScanner):
         )
         
         findings: List[Finding] = []
-        files_analyzed = 0
-        files_from_cache = 0
+        # Every file comes from the orchestrator-provided metric cache
+        files_analyzed = len(metric_cache)
+        files_from_cache = files_analyzed
         files_with_tests = 0
         
+        # Threshold and append bound once, outside the per-file loop
+        min_loc = self.NO_TESTS_MIN_LOC
+        add_finding = findings.append
+        
         for file_path, metrics in metric_cache.items():
-            files_analyzed += 1
-            files_from_cache += 1
-            
             if metrics.has_test:
                 files_with_tests += 1
+                continue
             
             # Rule 1: No Tests
-            if metrics.loc > self.NO_TESTS_MIN_LOC and not metrics.has_test:
-                findings.append(Finding(
+            if metrics.loc > min_loc:
+                add_finding(Finding.model_construct(
                     id=f"TEST001-{file_path}",
                     rule_id="TEST001",
                     severity="medium",
@@ -75,7 +80,7 @@ class TestingConfidenceScanner(DimensionScanner):
                     metrics={
                         "loc": metrics.loc,
                         "has_test": False,
-                        "threshold": self.NO_TESTS_MIN_LOC
+                        "threshold": min_loc
                     }
                 ))
         
@@ -101,9 +106,7 @@ class TestingConfidenceScanner(DimensionScanner):
         scan_result.status = "completed"
         scan_result.completed_at = datetime.utcnow()
         
-        if scan_result.started_at and scan_result.completed_at:
-            duration = scan_result.completed_at - scan_result.started_at
-            scan_result.duration_ms = int(duration.total_seconds() * 1000)
+        scan_result.duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         logger.info(
             f"Testing Confidence scan completed: score={score}, "
@@ -111,19 +114,3 @@ class TestingConfidenceScanner(DimensionScanner):
         )
         
         return scan_result
-    
-    def calculate_score(self, findings: List[Finding]) -> int:
-        """Calculate testing confidence score."""
-        score = 100
-        
-        for finding in findings:
-            if finding.severity == "critical":
-                score -= 20
-            elif finding.severity == "high":
-                score -= 10
-            elif finding.severity == "medium":
-                score -= 5
-            elif finding.severity == "low":
-                score -= 2
-        
-        return max(0, score)
@@ -3,8 +3,10 @@ Test Coverage Detector
 Detects if source files have corresponding test files
 """
 import logging
+import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Set
+from app.services.audit.file_walker import walk_files
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +14,10 @@ logger = logging.getLogger(__name__)
 class TestCoverageDetector:
     """Detects test coverage by finding test files"""
     
+    # Stored with cached has_test values; bump when detection results change
+    # so coverage cached by an older detector is recomputed
+    VERSION = 2
+    
     # Test file patterns
     TEST_PATTERNS = [
         'test_',      # test_module.py
@@ -22,20 +28,14 @@ class TestCoverageDetector:
         '.spec.'      # module.spec.ts
     ]
     
-    # Test directories
-    TEST_DIRS = [
-        'test',
-        'tests',
-        '__test__',
-        '__tests__',
-        'spec',
-        'specs'
-    ]
+    # TEST_PATTERNS as one case-insensitive search, for directory walks
+    _TEST_NAME_RE = re.compile('|'.join(re.escape(p) for p in TEST_PATTERNS), re.IGNORECASE)
     
     def detect_test_coverage(
         self,
         scan_dir: Path,
-        source_files: List[str]
+        source_files: List[str],
+        test_files: Optional[List[str]] = None
     ) -> Dict[str, bool]:
         """
         Detect which source files have test coverage.
@@ -43,6 +43,8 @@ class TestCoverageDetector:
         Args:
             scan_dir: Repository root directory
             source_files: List of source file paths (relative)
+            test_files: Test file paths already collected by the caller's
+                walk; if omitted, scan_dir is walked to find them
             
         Returns:
             Dict mapping source_file_path -> has_test (bool)
@@ -50,45 +52,47 @@ class TestCoverageDetector:
         coverage_map = {}
         
         # Find all test files
-        test_files = self._find_test_files(scan_dir)
+        if test_files is None:
+            test_files = self._find_test_files(scan_dir)
         logger.info(f"Found {len(test_files)} test files")
         
+        # Test stems are derived once here, not once per (source, test) pair.
+        # Lowercased stems are joined on NUL (never part of a file name) so a
+        # loose match is one substring search instead of one per test file.
+        test_stems = {Path(test_file).stem for test_file in test_files}
+        test_haystack = "\0".join(stem.lower() for stem in test_stems)
+        
         for source_file in source_files:
             coverage_map[source_file] = self._has_corresponding_test(
                 source_file,
-                test_files
+                test_stems,
+                test_haystack
             )
         
-        covered = sum(1 for has_test in coverage_map.values() if has_test)
-        logger.info(f"Test coverage: {covered}/{len(source_files)} files ({int(covered/len(source_files)*100) if source_files else 0}%)")
+        # Values are bools, so sum() counts the covered files directly
+        covered = sum(coverage_map.values())
+        total = len(source_files)
+        logger.info(f"Test coverage: {covered}/{total} files ({int(covered/total*100) if total else 0}%)")
         
         return coverage_map
     
+    @classmethod
+    def is_test_name(cls, name: str) -> bool:
+        """Whether a file name matches one of TEST_PATTERNS (any case)"""
+        return cls._TEST_NAME_RE.search(name) is not None
+    
     def _find_test_files(self, scan_dir: Path) -> List[str]:
-        """Find all test files in repository"""
-        test_files = []
-        
-        for root, dirs, files in scan_dir.walk() if hasattr(scan_dir, 'walk') else [(scan_dir, [], [])]:
-            # Check if in test directory
-            root_lower = str(root).lower()
-            is_test_dir = any(test_dir in root_lower for test_dir in self.TEST_DIRS)
-            
-            for file in files:
-                file_lower = file.lower()
-                
-                # Check test patterns
-                is_test_file = any(pattern in file_lower for pattern in self.TEST_PATTERNS)
-                
-                if is_test_dir or is_test_file:
-                    rel_path = str(Path(root) / file)
-                    test_files.append(rel_path)
-        
-        return test_files
+        """Find all test files in repository (files in test directories included)"""
+        return [
+            rel_path for entry, rel_path, in_test_dir in walk_files(scan_dir)
+            if in_test_dir or self.is_test_name(entry.name)
+        ]
     
     def _has_corresponding_test(
         self,
         source_file: str,
-        test_files: List[str]
+        test_stems: Set[str],
+        test_haystack: str
     ) -> bool:
         """Check if source file has a corresponding test file"""
         
@@ -107,15 +111,10 @@ class TestCoverageDetector:
             f"{source_stem}.spec"        # module.spec.ts
         ]
         
-        # Check if any test file matches
-        for test_file in test_files:
-            test_stem = Path(test_file).stem
-            
-            if test_stem in possible_test_names:
-                return True
-            
-            # Also check if source name is in test name (loose matching)
-            if source_stem.lower() in test_stem.lower():
-                return True
+        # Check if any test file matches (set lookups)
+        if any(name in test_stems for name in possible_test_names):
+            return True
         
-        return False
+        # Also check if source name is in test name (loose matching)
+        source_lower = source_stem.lower()
+        return bool(test_stems) and source_lower in test_haystack
@@ -1,67 +1,239 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
 import httpx
-from app.core.security import decrypt_token
+from app.core.security import decrypt_token_cached, forget_decrypted_token
 from app.models.user import User
-from typing import Optional, Dict, Any, List
+from typing import Awaitable, Callable, Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
 
 class GitHubService:
     """
     Centralized GitHub API interactions with Token Decryption.
+    
+    All calls share one pooled httpx.AsyncClient, so keep-alive connections
+    to api.github.com are reused across requests and users; the per-user
+    Authorization header is attached to each request instead of the client.
     """
     
-    async def get_client(self, user: User) -> httpx.AsyncClient:
-        token = decrypt_token(user.access_token)
-        return httpx.AsyncClient(
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28"
-            }
-        )
-
+    # Aliased history() selections per GraphQL request
+    GRAPHQL_BATCH_SIZE = 100
+    
+    # Conditional-GET bodies kept for revalidation (LRU)
+    ETAG_CACHE_SIZE = 256
+    
+    # Single-PR reads (fetch_pr, fetch_pr_diff) are served from memory for a
+    # short while: a review and the validation job repeat them within seconds
+    PR_CACHE_TTL = 60
+    DIFF_CACHE_TTL = 300
+    PR_CACHE_SIZE = 128
+    
+    API_HEADERS = {
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28"
+    }
+    
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        # (user_id, url, params) -> (etag, decoded body)
+        self._etag_cache: "OrderedDict[Tuple, Tuple[str, Any]]" = OrderedDict()
+        # (user_id, kind, owner, repo, pr_number, ...) -> (expires_at, value)
+        self._pr_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        # Requests in flight for a _pr_cache key, shared by concurrent callers
+        self._pr_inflight: Dict[Tuple, asyncio.Task] = {}
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.API_HEADERS,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                timeout=30.0
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared client (application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _auth_headers(self, user: User) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {decrypt_token_cached(user.access_token)}"}
+    
+    @staticmethod
+    def _etag_key(url: str, user: User, params: Optional[Dict[str, Any]]) -> Tuple:
+        return (str(user.id), url, tuple(sorted(params.items())) if params else ())
+    
+    @staticmethod
+    def _listing_request(owner: str, repo: str, kind: str, state: str = "open") -> Tuple[str, Dict[str, Any]]:
+        """URL and params of the first page of a repo's issues/pulls listing."""
+        return f"https://api.github.com/repos/{owner}/{repo}/{kind}", {"state": state, "per_page": 20}
+    
+    def forget_listing(self, owner: str, repo: str, kind: str, user: User, state: str = "open"):
+        """
+        Drop the cached ETag of an issues/pulls listing, so the next
+        only_if_changed poll downloads it again. For callers that failed to
+        process the body they were handed, which a 304 would otherwise skip.
+        """
+        url, params = self._listing_request(owner, repo, kind, state)
+        self._etag_cache.pop(self._etag_key(url, user, params), None)
+    
+    async def _get_json(
+        self,
+        url: str,
+        user: User,
+        params: Optional[Dict[str, Any]] = None,
+        allow_missing: bool = False,
+        only_if_changed: bool = False
+    ) -> Any:
+        """
+        GET a JSON resource, revalidating with the ETag of the last response.
+        
+        GitHub answers If-None-Match with an empty 304 when nothing changed
+        (and doesn't count it against the rate limit), so the cached body is
+        returned instead of re-downloading and re-decoding it. Entries are
+        per user, since visibility depends on the token.
+        
+        Returns None on 404 when allow_missing is set, and on 304 when
+        only_if_changed is set (the caller already processed that body).
+        """
+        key = self._etag_key(url, user, params)
+        headers = self._auth_headers(user)
+        cached = self._etag_cache.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        
+        resp = await self.client.get(url, params=params, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            self._etag_cache.move_to_end(key)
+            return None if only_if_changed else cached[1]
+        if resp.status_code == 404 and allow_missing:
+            return None
+        if resp.status_code == 401:
+            # Token revoked or expired: don't keep serving its plaintext
+            forget_decrypted_token(user.access_token)
+        resp.raise_for_status()
+        
+        data = resp.json()
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._etag_cache[key] = (etag, data)
+            self._etag_cache.move_to_end(key)
+            if len(self._etag_cache) > self.ETAG_CACHE_SIZE:
+                self._etag_cache.popitem(last=False)
+        return data
+    
+    async def _cached_pr_read(self, key: Tuple, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return a fresh _pr_cache entry, or run fetch() once for all concurrent
+        callers of the same key and cache its result for ttl seconds.
+        """
+        entry = self._pr_cache.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._pr_cache.move_to_end(key)
+                return entry[1]
+            del self._pr_cache[key]
+        
+        task = self._pr_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._pr_inflight[key] = task
+            
+            def store(done: asyncio.Task):
+                # Skipped if invalidate_pr dropped the request meanwhile
+                if self._pr_inflight.get(key) is not done:
+                    return
+                del self._pr_inflight[key]
+                if done.cancelled() or done.exception() is not None:
+                    return
+                self._pr_cache[key] = (time.monotonic() + ttl, done.result())
+                if len(self._pr_cache) > self.PR_CACHE_SIZE:
+                    self._pr_cache.popitem(last=False)
+            
+            task.add_done_callback(store)
+        # Shielded so one caller's cancellation doesn't fail the others
+        return await asyncio.shield(task)
+    
+    def invalidate_pr(self, owner: str, repo: str, pr_number: int):
+        """Drop cached reads of a PR (e.g. new commits were pushed)."""
+        target = (owner, repo, pr_number)
+        for cache in (self._pr_cache, self._pr_inflight):
+            for key in [k for k in cache if k[2:5] == target]:
+                del cache[key]
+    
     async def fetch_issue(self, owner: str, repo: str, issue_number: int, user: User) -> Optional[Dict]:
-        async with await self.get_client(user) as client:
-            resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}")
-            if resp.status_code == 404: return None
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_json(
+            f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}",
+            user,
+            allow_missing=True
+        )
 
-    async def fetch_issues(self, owner: str, repo: str, user: User, state: str="open") -> List[Dict]:
-        async with await self.get_client(user) as client:
-            resp = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/issues",
-                params={"state": state, "per_page": 20}
-            )
-            resp.raise_for_status()
-            return resp.json()
+    async def fetch_issues(
+        self, owner: str, repo: str, user: User, state: str="open", only_if_changed: bool = False
+    ) -> Optional[List[Dict]]:
+        url, params = self._listing_request(owner, repo, "issues", state)
+        return await self._get_json(url, user, params=params, only_if_changed=only_if_changed)
 
     async def fetch_pr(self, owner: str, repo: str, pr_number: int, user: User) -> Optional[Dict]:
-        async with await self.get_client(user) as client:
-            resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}")
-            if resp.status_code == 404: return None
-            resp.raise_for_status()
-            return resp.json()
-
-    async def fetch_prs(self, owner: str, repo: str, user: User) -> List[Dict]:
-        async with await self.get_client(user) as client:
-            resp = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/pulls",
-                params={"state": "open", "per_page": 20}
+        return await self._cached_pr_read(
+            (str(user.id), "pr", owner, repo, pr_number),
+            self.PR_CACHE_TTL,
+            lambda: self._get_json(
+                f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}",
+                user,
+                allow_missing=True
             )
-            resp.raise_for_status()
-            return resp.json()
+        )
+
+    async def fetch_prs(
+        self, owner: str, repo: str, user: User, only_if_changed: bool = False
+    ) -> Optional[List[Dict]]:
+        url, params = self._listing_request(owner, repo, "pulls")
+        return await self._get_json(url, user, params=params, only_if_changed=only_if_changed)
 
-    async def fetch_pr_diff(self, owner: str, repo: str, pr_number: int, user: User) -> str:
-        token = decrypt_token(user.access_token)
-        async with httpx.AsyncClient(
+    async def fetch_pr_diff(
+        self, owner: str, repo: str, pr_number: int, user: User, max_chars: Optional[int] = None
+    ) -> str:
+        """
+        Unified diff of a PR. With max_chars, only the first max_chars
+        characters are returned and the download stops once they've arrived.
+        """
+        return await self._cached_pr_read(
+            (str(user.id), "diff", owner, repo, pr_number, max_chars),
+            self.DIFF_CACHE_TTL,
+            lambda: self._download_pr_diff(owner, repo, pr_number, user, max_chars)
+        )
+    
+    async def _download_pr_diff(
+        self, owner: str, repo: str, pr_number: int, user: User, max_chars: Optional[int]
+    ) -> str:
+        # Streamed into one buffer and decoded once as UTF-8, skipping
+        # httpx's charset detection over the whole (possibly large) diff.
+        # UTF-8 is at most 4 bytes per character, so 4 * max_chars bytes
+        # always hold max_chars complete characters.
+        max_bytes = 4 * max_chars if max_chars is not None else None
+        diff = bytearray()
+        async with self.client.stream(
+            "GET",
+            f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}",
             headers={
-                "Authorization": f"Bearer {token}",
+                **self._auth_headers(user),
                 "Accept": "application/vnd.github.v3.diff"
             },
             follow_redirects=True
-        ) as client:
-            resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}")
+        ) as resp:
             resp.raise_for_status()
-            return resp.text
+            async for chunk in resp.aiter_bytes(65536):
+                diff.extend(chunk)
+                if max_bytes is not None and len(diff) >= max_bytes:
+                    break
+        text = diff.decode("utf-8", errors="replace")
+        return text[:max_chars] if max_chars is not None else text
 
     async def fetch_file_commits(self, owner: str, repo: str, file_path: str, token: str, since_days: int = 90) -> int:
         """
@@ -74,44 +246,129 @@ class GitHubService:
         
         since_date = (datetime.utcnow() - timedelta(days=since_days)).isoformat()
         
-        async with httpx.AsyncClient(
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28"
-            },
-            timeout=30.0
-        ) as client:
-            try:
-                # GitHub API: Get commits for a specific file
-                resp = await client.get(
-                    f"https://api.github.com/repos/{owner}/{repo}/commits",
-                    params={"path": file_path, "since": since_date, "per_page": 100}
-                )
-                
-                if resp.status_code == 404:
-                    return 0
-                    
-                resp.raise_for_status()
-                commits = resp.json()
-                return len(commits)
-                
-            except Exception as e:
-                # Graceful degradation: if API fails, return 0 (no churn data)
+        try:
+            # GitHub API: Get commits for a specific file
+            resp = await self.client.get(
+                f"https://api.github.com/repos/{owner}/{repo}/commits",
+                params={"path": file_path, "since": since_date, "per_page": 100},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            
+            if resp.status_code == 404:
                 return 0
+                
+            resp.raise_for_status()
+            commits = resp.json()
+            return len(commits)
+            
+        except Exception as e:
+            # Graceful degradation: if API fails, return 0 (no churn data)
+            return 0
+    
+    async def fetch_files_commit_counts(
+        self,
+        owner: str,
+        repo: str,
+        file_paths: List[str],
+        token: str,
+        since_days: int = 90
+    ) -> Optional[Dict[str, int]]:
+        """
+        Commit counts for many files via batched GraphQL requests (churn metric).
+        
+        Each path becomes an aliased history(path:, since:) selection on the
+        default branch HEAD, instead of one REST round-trip per file. Paths
+        are sent GRAPHQL_BATCH_SIZE per request, so N files cost ceil(N/100)
+        round-trips. Counts are capped at 100 to match the per_page limit
+        fetch_file_commits uses.
+        
+        Returns: {file_path: commit_count}, or None if any query failed and
+        the caller should fall back to per-file requests.
+        """
+        from datetime import datetime, timedelta
+        
+        if not file_paths:
+            return {}
+        
+        since_date = (datetime.utcnow() - timedelta(days=since_days)).replace(microsecond=0).isoformat() + "Z"
+        
+        batch_size = self.GRAPHQL_BATCH_SIZE
+        batches = [file_paths[i:i + batch_size] for i in range(0, len(file_paths), batch_size)]
+        results = await asyncio.gather(
+            *(self._query_commit_counts(owner, repo, batch, token, since_date) for batch in batches)
+        )
+        
+        churn_map = {}
+        for result in results:
+            if result is None:
+                return None
+            churn_map.update(result)
+        return churn_map
+    
+    async def _query_commit_counts(
+        self,
+        owner: str,
+        repo: str,
+        file_paths: List[str],
+        token: str,
+        since_date: str
+    ) -> Optional[Dict[str, int]]:
+        """One GraphQL request for a batch of fetch_files_commit_counts paths."""
+        # Paths go in as variables, so no escaping of file names is needed
+        var_defs = "".join(f", $p{i}: String!" for i in range(len(file_paths)))
+        selections = " ".join(
+            f"f{i}: history(path: $p{i}, since: $since) {{ totalCount }}"
+            for i in range(len(file_paths))
+        )
+        query = (
+            f"query($owner: String!, $name: String!, $since: GitTimestamp!{var_defs}) {{"
+            f" repository(owner: $owner, name: $name) {{ defaultBranchRef {{ target {{"
+            f" ... on Commit {{ {selections} }} }} }} }} }}"
+        )
+        variables = {"owner": owner, "name": repo, "since": since_date}
+        variables.update({f"p{i}": path for i, path in enumerate(file_paths)})
+        
+        try:
+            resp = await self.client.post(
+                "https://api.github.com/graphql",
+                json={"query": query, "variables": variables},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            resp.raise_for_status()
+            payload = resp.json()
+            
+            repository = (payload.get("data") or {}).get("repository")
+            if payload.get("errors") or repository is None:
+                return None
+            
+            # Empty repository: no default branch, so no churn
+            branch = repository.get("defaultBranchRef")
+            if branch is None:
+                return {path: 0 for path in file_paths}
+            
+            history = branch["target"]
+            return {
+                path: min(history[f"f{i}"]["totalCount"], 100)
+                for i, path in enumerate(file_paths)
+            }
+            
+        except Exception:
+            # Caller degrades to per-file REST queries
+            logger.warning("GraphQL commit-count query failed for %s/%s", owner, repo, exc_info=True)
+            return None
     
     async def post_pr_comment(self, owner: str, repo: str, pr_number: int, body: str, user: User) -> Dict:
         """
         Post a general comment on a PR (issue comment).
         Uses the issues endpoint since PR comments are also issue comments.
         """
-        async with await self.get_client(user) as client:
-            resp = await client.post(
-                f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments",
-                json={"body": body}
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self.client.post(
+            f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments",
+            json={"body": body},
+            headers=self._auth_headers(user)
+        )
+        resp.raise_for_status()
+        return resp.json()
     
     async def post_pr_review_comment(
         self, 
@@ -133,18 +390,18 @@ class GitHubService:
             body: Comment text (markdown supported)
             line: Line number in the diff to comment on
         """
-        async with await self.get_client(user) as client:
-            resp = await client.post(
-                f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/comments",
-                json={
-                    "body": body,
-                    "commit_id": commit_id,
-                    "path": path,
-                    "line": line,
-                    "side": "RIGHT"  # Comment on the new version of the file
-                }
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self.client.post(
+            f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/comments",
+            json={
+                "body": body,
+                "commit_id": commit_id,
+                "path": path,
+                "line": line,
+                "side": "RIGHT"  # Comment on the new version of the file
+            },
+            headers=self._auth_headers(user)
+        )
+        resp.raise_for_status()
+        return resp.json()
 
 github_service = GitHubService()
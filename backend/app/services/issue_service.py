@@ -1,19 +1,50 @@
+import os
+import time
+import uuid
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from beanie import PydanticObjectId
 from fastapi import BackgroundTasks
 
 from app.models.issue import Issue, IssueChecklistSummary, ChecklistItem
-from app.models.repo import Repo
+from app.models.repo import Repo, RepoIdView
 from app.models.user import User
 from app.services.github import github_service
 from app.services.assistant_service import assistant
 from bson import ObjectId
 
+def _new_item_ids(count: int) -> Iterator[str]:
+    """uuid4 strings for `count` new checklist items, from a single os.urandom read."""
+    raw = os.urandom(16 * count)
+    return (str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, len(raw), 16))
+
 class IssueService:
-    async def list_issues(self, owner: str, repo: str, user: User, background_tasks: BackgroundTasks) -> List[Issue]:
-        repo_doc = await Repo.find_one(Repo.owner == owner, Repo.name == repo)
+    # owner/name -> id mapping is effectively immutable; a short TTL is plenty
+    REPO_ID_TTL = 60
+    
+    def __init__(self):
+        self._repo_ids: Dict[tuple, tuple] = {}  # (owner, name) -> (repo_id, expires_at)
+    
+    async def lookup_repo_id(self, owner: str, repo: str) -> Optional[PydanticObjectId]:
+        """Repo id for owner/name, cached in-process and fetched with an _id-only projection."""
+        key = (owner, repo)
+        now = time.monotonic()
+        cached = self._repo_ids.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        
+        repo_doc = await Repo.find_one(
+            Repo.owner == owner, Repo.name == repo, projection_model=RepoIdView
+        )
         if not repo_doc:
+            return None
+        self._repo_ids[key] = (repo_doc.id, now + self.REPO_ID_TTL)
+        return repo_doc.id
+    
+    async def list_issues(self, owner: str, repo: str, user: User, background_tasks: BackgroundTasks) -> List[Issue]:
+        repo_id = await self.lookup_repo_id(owner, repo)
+        if not repo_id:
             return []
             
         # Background sync
@@ -21,14 +52,14 @@ class IssueService:
         # Trigger background sync if needed (optional, simplistic for now)
         # background_tasks.add_task(self._sync_issues_task, repo_doc, token)
 
-        return await Issue.find(Issue.repo_id == repo_doc.id).sort("-created_at").to_list()
+        return await Issue.find(Issue.repo_id == repo_id).sort("-created_at").to_list()
 
     async def get_or_sync_issue(self, owner: str, repo: str, issue_number: int, user: User, background_tasks: BackgroundTasks) -> Optional[Issue]:
-        repo_doc = await Repo.find_one(Repo.owner == owner, Repo.name == repo)
-        if not repo_doc:
+        repo_id = await self.lookup_repo_id(owner, repo)
+        if not repo_id:
             return None
             
-        issue = await Issue.find_one(Issue.repo_id == repo_doc.id, Issue.issue_number == issue_number)
+        issue = await Issue.find_one(Issue.repo_id == repo_id, Issue.issue_number == issue_number)
         
         # If not found or stale, we could sync. For now just return what we have or try fetch from GH if missing
         if not issue and user.access_token:
@@ -37,10 +68,26 @@ class IssueService:
              
         return issue
 
-    async def _generate_checklist_task(self, issue_id: PydanticObjectId, title: str, body: str):
-        issue = await Issue.get(issue_id)
-        if not issue: return
+    async def get_or_sync_issues(self, owner: str, repo: str, issue_numbers: List[int], user: User) -> Dict[int, Issue]:
+        """
+        Batch form of get_or_sync_issue for sync jobs: one Repo lookup and
+        one $in query for all issue numbers instead of two round-trips each.
+        """
+        if not issue_numbers:
+            return {}
         
+        repo_id = await self.lookup_repo_id(owner, repo)
+        if not repo_id:
+            return {}
+        
+        issues = await Issue.find(
+            {"repo_id": repo_id, "issue_number": {"$in": issue_numbers}}
+        ).to_list()
+        
+        # Missing issues would be synced here, as in get_or_sync_issue
+        return {issue.issue_number: issue for issue in issues}
+
+    async def _generate_checklist_task(self, issue_id: PydanticObjectId, title: str, body: str):
         # Use Assistant - Intent Layer
         checklist_data = await assistant.understand_intent(title, body)
         items = []
@@ -52,11 +99,17 @@ class IssueService:
                 status="pending"
             ))
         
-        issue.checklist = items
-        issue.checklist_summary.total = len(items)
-        issue.checklist_summary.pending = len(items)
-        issue.status = "open"
-        await issue.save()
+        # Targeted $set: no read of the issue and no full-document rewrite.
+        # Re-running replaces the checklist, so the task is idempotent.
+        await Issue.get_motor_collection().update_one(
+            {"_id": issue_id},
+            {"$set": {
+                "checklist": [item.model_dump() for item in items],
+                "checklist_summary.total": len(items),
+                "checklist_summary.pending": len(items),
+                "status": "open"
+            }}
+        )
 
     async def generate_checklist_now(self, issue: Issue) -> Issue:
         """
@@ -70,11 +123,9 @@ class IssueService:
         existing_map = {item.text: item for item in issue.checklist}
         
         new_checklist = []
-        import uuid
-        
-        passed_count = 0
-        failed_count = 0
-        pending_count = 0
+        new_ids = _new_item_ids(
+            sum(1 for item in items if item.get("text", "No description") not in existing_map)
+        )
         
         for item in items:
             text = item.get("text", "No description")
@@ -86,7 +137,7 @@ class IssueService:
             else:
                 # Create new
                 new_item = ChecklistItem(
-                    id=str(uuid.uuid4()),
+                    id=next(new_ids),
                     text=text,
                     required=item.get("required", True),
                     status="pending"
@@ -94,19 +145,17 @@ class IssueService:
             
             new_checklist.append(new_item)
             
-            # Count stats
-            if new_item.status == "passed": passed_count += 1
-            elif new_item.status == "failed": failed_count += 1
-            else: pending_count += 1
-            
         issue.checklist = new_checklist
         
-        # Reset summary
+        # Reset summary; anything not passed/failed counts as pending
+        status_counts = Counter(item.status for item in new_checklist)
+        passed_count = status_counts["passed"]
+        failed_count = status_counts["failed"]
         issue.checklist_summary = IssueChecklistSummary(
             total=len(new_checklist),
             passed=passed_count, 
             failed=failed_count, 
-            pending=pending_count
+            pending=len(new_checklist) - passed_count - failed_count
         )
         issue.updated_at = datetime.utcnow()
         await issue.save()
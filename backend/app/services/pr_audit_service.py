@@ -1,4 +1,5 @@
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Tuple
 from app.models.user import User
 from app.models.scan import RiskItem
 from app.services.github import github_service
@@ -14,6 +15,45 @@ class PRAuditService:
     
     # Rate limiting constants
     MAX_INLINE_COMMENTS = 20  # Warn if more than this many inline comments
+    INLINE_COMMENT_CONCURRENCY = 5  # Review comments in flight at once
+    
+    # Severities kept by each severity_filter ("all" and unknown keep everything)
+    SEVERITY_FILTERS = {
+        "critical_high": frozenset({"critical", "high"}),
+        "critical": frozenset({"critical"})
+    }
+    
+    # Comment formatting tables
+    SEVERITY_EMOJI = {
+        "critical": "🔴",
+        "high": "🟠",
+        "medium": "🟡",
+        "low": "🟢"
+    }
+    SEVERITY_ROWS = (
+        ("critical", "| 🔴 **Critical** | **{n}** |\n"),
+        ("high", "| 🟠 **High** | **{n}** |\n"),
+        ("medium", "| 🟡 Medium | {n} |\n"),
+        ("low", "| 🟢 Low | {n} |\n")
+    )
+    METHODOLOGY_FOOTER = (
+        "---\n\n"
+        "### 📝 About These Findings\n\n"
+        "RevFlo uses **static metrics** and **hard-coded rules** to identify risk:\n\n"
+        "- **Hotspots**: High complexity + frequent changes\n"
+        "- **Large Files**: Files exceeding recommended size limits\n"
+        "- **Deep Nesting**: Excessive indentation complexity\n"
+        "- **No Tests**: Source files without corresponding test coverage\n\n"
+        "*No AI inference is used for decision-making. All findings are deterministic and reproducible.*\n\n"
+        "---\n"
+        "*Powered by [RevFlo](https://revflo.dev) | Metric-Driven Code Intelligence*"
+    )
+    RECOMMENDATIONS = {
+        "Hotspot": "Consider refactoring to reduce complexity or splitting into smaller modules.",
+        "Large File": "Break this file into smaller, focused modules.",
+        "Deep Nesting": "Reduce nesting depth using early returns or extracting methods.",
+        "No Tests": "Add unit tests to improve code reliability and maintainability."
+    }
     
     async def post_audit_to_pr(
         self, 
@@ -41,14 +81,15 @@ class PRAuditService:
             Dict with posted_count, error_count, warnings, and details
         """
         # Filter findings based on severity
-        filtered_findings = self._filter_findings(findings, severity_filter)
+        # One pass: severity filter, severity counts and inline-capable findings
+        filtered_findings, severity_counts, inline_findings = self._prepare_findings(findings, severity_filter)
         
         posted_comments = []
         errors = []
         warnings = []
         
         # Rate limit warning
-        inline_count = sum(1 for f in filtered_findings if f.file_path and f.line_number)
+        inline_count = len(inline_findings)
         if inline_count > self.MAX_INLINE_COMMENTS:
             warnings.append(
                 f"High number of inline comments ({inline_count}). "
@@ -57,7 +98,7 @@ class PRAuditService:
             logger.warning(f"Posting {inline_count} inline comments to PR #{pr_number}")
         
         # Post a summary comment first
-        summary = self._generate_summary_comment(filtered_findings, len(findings), severity_filter)
+        summary = self._generate_summary_comment(filtered_findings, severity_counts, len(findings), severity_filter)
         try:
             result = await github_service.post_pr_comment(
                 owner, repo_name, pr_number, summary, user
@@ -69,38 +110,48 @@ class PRAuditService:
             errors.append({"type": "summary", "error": str(e)})
             # If summary fails, still try to post inline comments
         
-        # Post inline comments for findings with file/line info
-        for finding in filtered_findings:
-            if finding.file_path and finding.line_number:
-                comment_body = self._format_finding_comment(finding)
-                try:
-                    result = await github_service.post_pr_review_comment(
-                        owner, repo_name, pr_number,
-                        commit_sha, finding.file_path, comment_body, finding.line_number,
-                        user
-                    )
-                    posted_comments.append({
-                        "type": "inline",
-                        "finding_id": finding.id,
-                        "file": finding.file_path,
-                        "line": finding.line_number,
-                        "comment_id": result.get("id")
-                    })
-                except Exception as e:
-                    # Graceful degradation: log error but continue
-                    error_msg = str(e)
-                    logger.warning(f"Failed to post inline comment for {finding.file_path}:{finding.line_number}: {error_msg}")
-                    
-                    # Check for rate limiting
-                    if "rate limit" in error_msg.lower() or "403" in error_msg:
-                        warnings.append("GitHub API rate limit may have been reached")
-                    
-                    errors.append({
-                        "finding_id": finding.id,
-                        "file": finding.file_path,
-                        "line": finding.line_number,
-                        "error": error_msg
-                    })
+        # Post inline comments for findings with file/line info,
+        # concurrently but capped to stay under GitHub's secondary rate limits
+        semaphore = asyncio.Semaphore(self.INLINE_COMMENT_CONCURRENCY)
+        
+        async def post_inline(finding: RiskItem) -> Dict:
+            async with semaphore:
+                return await github_service.post_pr_review_comment(
+                    owner, repo_name, pr_number,
+                    commit_sha, finding.file_path, self._format_finding_comment(finding), finding.line_number,
+                    user
+                )
+        
+        results = await asyncio.gather(
+            *(post_inline(finding) for finding in inline_findings),
+            return_exceptions=True
+        )
+        
+        # Reassembled in finding order
+        for finding, result in zip(inline_findings, results):
+            if not isinstance(result, BaseException):
+                posted_comments.append({
+                    "type": "inline",
+                    "finding_id": finding.id,
+                    "file": finding.file_path,
+                    "line": finding.line_number,
+                    "comment_id": result.get("id")
+                })
+            else:
+                # Graceful degradation: log error but continue
+                error_msg = str(result)
+                logger.warning(f"Failed to post inline comment for {finding.file_path}:{finding.line_number}: {error_msg}")
+                
+                # Check for rate limiting
+                if "rate limit" in error_msg.lower() or "403" in error_msg:
+                    warnings.append("GitHub API rate limit may have been reached")
+                
+                errors.append({
+                    "finding_id": finding.id,
+                    "file": finding.file_path,
+                    "line": finding.line_number,
+                    "error": error_msg
+                })
         
         result = {
             "status": "completed",
@@ -120,104 +171,95 @@ class PRAuditService:
         
         return result
     
-    def _filter_findings(self, findings: List[RiskItem], severity_filter: str) -> List[RiskItem]:
-        """Filter findings based on severity."""
-        if severity_filter == "all":
-            return findings
-        elif severity_filter == "critical_high":
-            return [f for f in findings if f.severity in ["critical", "high"]]
-        elif severity_filter == "critical":
-            return [f for f in findings if f.severity == "critical"]
-        return findings
+    def _prepare_findings(
+        self,
+        findings: List[RiskItem],
+        severity_filter: str
+    ) -> Tuple[List[RiskItem], Dict[str, int], List[RiskItem]]:
+        """
+        Filter findings based on severity, in the same pass counting the kept
+        findings per severity and collecting those that can be posted inline.
+        
+        Returns (filtered_findings, severity_counts, inline_findings).
+        """
+        allowed = self.SEVERITY_FILTERS.get(severity_filter)  # None keeps all
+        filtered = []
+        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        inline = []
+        for f in findings:
+            if allowed is not None and f.severity not in allowed:
+                continue
+            filtered.append(f)
+            severity_counts[f.severity] = severity_counts.get(f.severity, 0) + 1
+            if f.file_path and f.line_number:
+                inline.append(f)
+        return filtered, severity_counts, inline
     
     def _generate_summary_comment(
         self, 
         filtered_findings: List[RiskItem], 
+        severity_counts: Dict[str, int],
         total_findings: int,
         severity_filter: str
     ) -> str:
         """Generate a markdown summary comment for the PR."""
-        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-        for f in filtered_findings:
-            severity_counts[f.severity] = severity_counts.get(f.severity, 0) + 1
-        
         # Build markdown
-        comment = "## 🔍 RevFlo Code Audit\n\n"
-        comment += "RevFlo has analyzed this repository using **deterministic, metric-driven rules**.\n\n"
+        parts = [
+            "## 🔍 RevFlo Code Audit\n\n",
+            "RevFlo has analyzed this repository using **deterministic, metric-driven rules**.\n\n"
+        ]
         
         # Overall summary
         if not filtered_findings:
-            comment += "✅ **No critical or high severity issues found!**\n\n"
+            parts.append("✅ **No critical or high severity issues found!**\n\n")
             if total_findings > 0:
-                comment += f"*Note: {total_findings} lower-severity findings were detected but not shown here.*\n\n"
+                parts.append(f"*Note: {total_findings} lower-severity findings were detected but not shown here.*\n\n")
         else:
-            comment += "### 📊 Findings Summary\n\n"
-            comment += "| Severity | Count |\n"
-            comment += "|----------|-------|\n"
-            
-            if severity_counts["critical"] > 0:
-                comment += f"| 🔴 **Critical** | **{severity_counts['critical']}** |\n"
-            if severity_counts["high"] > 0:
-                comment += f"| 🟠 **High** | **{severity_counts['high']}** |\n"
-            if severity_counts["medium"] > 0:
-                comment += f"| 🟡 Medium | {severity_counts['medium']} |\n"
-            if severity_counts["low"] > 0:
-                comment += f"| 🟢 Low | {severity_counts['low']} |\n"
-            
-            comment += "\n"
+            parts.append(
+                "### 📊 Findings Summary\n\n"
+                "| Severity | Count |\n"
+                "|----------|-------|\n"
+            )
+            parts.extend(
+                row.format(n=severity_counts[severity])
+                for severity, row in self.SEVERITY_ROWS
+                if severity_counts[severity] > 0
+            )
+            parts.append("\n")
             
             if total_findings > len(filtered_findings):
-                comment += f"*Showing **{len(filtered_findings)}** of **{total_findings}** total findings (filter: `{severity_filter}`)*\n\n"
+                parts.append(f"*Showing **{len(filtered_findings)}** of **{total_findings}** total findings (filter: `{severity_filter}`)*\n\n")
         
         # Explanation of methodology
-        comment += "---\n\n"
-        comment += "### 📝 About These Findings\n\n"
-        comment += "RevFlo uses **static metrics** and **hard-coded rules** to identify risk:\n\n"
-        comment += "- **Hotspots**: High complexity + frequent changes\n"
-        comment += "- **Large Files**: Files exceeding recommended size limits\n"
-        comment += "- **Deep Nesting**: Excessive indentation complexity\n"
-        comment += "- **No Tests**: Source files without corresponding test coverage\n\n"
-        comment += "*No AI inference is used for decision-making. All findings are deterministic and reproducible.*\n\n"
-        comment += "---\n"
-        comment += "*Powered by [RevFlo](https://revflo.dev) | Metric-Driven Code Intelligence*"
-        
-        return comment
+        parts.append(self.METHODOLOGY_FOOTER)
+        
+        return "".join(parts)
     
     def _format_finding_comment(self, finding: RiskItem) -> str:
         """Format a single finding as a markdown comment."""
-        emoji_map = {
-            "critical": "🔴",
-            "high": "🟠",
-            "medium": "🟡",
-            "low": "🟢"
-        }
-        emoji = emoji_map.get(finding.severity, "⚪")
+        emoji = self.SEVERITY_EMOJI.get(finding.severity, "⚪")
         
-        comment = f"{emoji} **{finding.severity.upper()}**: {finding.rule_type}\n\n"
-        comment += f"**Issue**: {finding.description}\n\n"
+        parts = [
+            f"{emoji} **{finding.severity.upper()}**: {finding.rule_type}\n\n",
+            f"**Issue**: {finding.description}\n\n"
+        ]
         
         if finding.explanation:
-            comment += f"**Why this matters**: {finding.explanation}\n\n"
+            parts.append(f"**Why this matters**: {finding.explanation}\n\n")
         
         # Show metrics that triggered the rule
         if finding.metrics:
-            comment += "**Metrics**:\n"
-            for key, value in finding.metrics.items():
-                comment += f"- `{key}`: **{value}**\n"
-            comment += "\n"
+            parts.append("**Metrics**:\n")
+            parts.extend(f"- `{key}`: **{value}**\n" for key, value in finding.metrics.items())
+            parts.append("\n")
         
         # Actionable advice
-        if finding.rule_type == "Hotspot":
-            comment += "💡 **Recommendation**: Consider refactoring to reduce complexity or splitting into smaller modules.\n"
-        elif finding.rule_type == "Large File":
-            comment += "💡 **Recommendation**: Break this file into smaller, focused modules.\n"
-        elif finding.rule_type == "Deep Nesting":
-            comment += "💡 **Recommendation**: Reduce nesting depth using early returns or extracting methods.\n"
-        elif finding.rule_type == "No Tests":
-            comment += "💡 **Recommendation**: Add unit tests to improve code reliability and maintainability.\n"
-        
-        comment += "\n---\n*RevFlo | Deterministic Code Analysis*"
-        
-        return comment
+        recommendation = self.RECOMMENDATIONS.get(finding.rule_type)
+        if recommendation:
+            parts.append(f"💡 **Recommendation**: {recommendation}\n")
+        
+        parts.append("\n---\n*RevFlo | Deterministic Code Analysis*")
+        
+        return "".join(parts)
 
 pr_audit_service = PRAuditService()
@@ -1,91 +1,190 @@
+import asyncio
+import logging
+import time
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from beanie import PydanticObjectId
 from fastapi import BackgroundTasks
+from pymongo import UpdateOne
 
-from app.models.pr import PullRequest
-from app.models.repo import Repo
+from app.models.pr import PullRequest, PRSyncView
 from app.models.user import User
 from app.models.issue import Issue, ValidationResult
 from app.schemas.models import PRSummary
 from app.services.github import github_service
 from app.services.assistant_service import assistant
+from app.services.issue_service import issue_service
+
+logger = logging.getLogger(__name__)
+
+# (status, evidence, reasoning) for checklist items the AI didn't return
+UNVALIDATED = ("pending", None, None)
+
+def _parse_gh_ts(value: str) -> datetime:
+    # GitHub timestamps ("2024-01-02T03:04:05Z") as naive UTC, as strptime gave;
+    # fromisoformat is a C parser and doesn't re-read a format string per call
+    return datetime.fromisoformat(value.removesuffix("Z"))
+
+def index_checklist_results(results: List[dict]) -> Dict[str, tuple]:
+    # AI checklist results by item id, unpacked once as (status, evidence, reasoning)
+    return {
+        item_id: (item.get("status", "pending"), item.get("evidence"), item.get("reasoning"))
+        for item in results if (item_id := item.get("id"))
+    }
 
 class PRService:
-    async def list_prs(self, owner: str, repo_name: str, user: User, bg_tasks: BackgroundTasks = None) -> List[PRSummary]:
-        repo = await Repo.find_one(Repo.owner == owner, Repo.name == repo_name)
-        if not repo:
+    # A repo synced this recently isn't synced again (list_prs schedules one per request)
+    SYNC_COOLDOWN = 30
+    
+    def __init__(self):
+        # Per-repo sync locks, kept while any sync holds or waits on them
+        self._sync_locks: Dict[PydanticObjectId, asyncio.Lock] = {}
+        self._sync_lock_users: Counter = Counter()
+        self._last_sync: Dict[PydanticObjectId, float] = {}
+    
+    async def list_prs(
+        self, owner: str, repo_name: str, user: User, bg_tasks: BackgroundTasks = None,
+        limit: int = 50, offset: int = 0
+    ) -> List[PRSummary]:
+        repo_id = await issue_service.lookup_repo_id(owner, repo_name)
+        if not repo_id:
             return []
 
         # 1. Return DB Cache immediately
-        local_prs = await PullRequest.find(PullRequest.repo_id == repo.id).sort("-pr_number").to_list()
+        local_prs = await self._find_pr_summaries(repo_id, limit, offset)
         
         # 2. Trigger Background Sync
-        if not local_prs:
+        if not local_prs and offset == 0:
             # Sync immediately if no cache
-            await self.sync_prs_bg(owner, repo_name, user, repo.id)
-            local_prs = await PullRequest.find(PullRequest.repo_id == repo.id).sort("-pr_number").to_list()
+            await self.sync_prs_bg(owner, repo_name, user, repo_id)
+            local_prs = await self._find_pr_summaries(repo_id, limit, offset)
         elif bg_tasks:
             # Background update if we have data
-            bg_tasks.add_task(self.sync_prs_bg, owner, repo_name, user, repo.id)
+            bg_tasks.add_task(self.sync_prs_bg, owner, repo_name, user, repo_id)
             
-        # Map to summary
-        results = []
-        for pr in local_prs:
-            results.append(PRSummary(
-                pr_number=pr.pr_number,
-                title=pr.title,
-                author=pr.author,
-                created_at=pr.created_at,
-                github_url=pr.github_url,
-                health_score=pr.health_score,
-                validation_status=pr.validation_status
-            ))
-        return results
+        return local_prs
+
+    async def _find_pr_summaries(self, repo_id: PydanticObjectId, limit: int, offset: int) -> List[PRSummary]:
+        # Projected straight into the summary model: the analysis fields
+        # (manifest, code_health, suggested_tests, ...) never leave Mongo.
+        # The page is cut by the (repo_id, pr_number) index, not in memory.
+        return await PullRequest.find(
+            PullRequest.repo_id == repo_id, projection_model=PRSummary
+        ).sort("-pr_number").skip(offset).limit(limit).to_list()
 
     async def sync_prs_bg(self, owner: str, repo_name: str, user: User, repo_id: PydanticObjectId):
+        # Concurrent requests for the same repo coalesce into one sync
+        lock = self._sync_locks.get(repo_id)
+        if lock is None:
+            lock = self._sync_locks[repo_id] = asyncio.Lock()
+        self._sync_lock_users[repo_id] += 1
+        try:
+            async with lock:
+                last_sync = self._last_sync.get(repo_id)
+                if last_sync is not None and time.monotonic() - last_sync < self.SYNC_COOLDOWN:
+                    return
+                # A failed sync is retried by the next request, not held off
+                if await self._sync_prs(owner, repo_name, user, repo_id):
+                    self._last_sync[repo_id] = time.monotonic()
+        finally:
+            # Counted rather than checked with locked(): a woken waiter
+            # doesn't hold the lock yet, but still needs it to stay shared
+            self._sync_lock_users[repo_id] -= 1
+            if not self._sync_lock_users[repo_id]:
+                del self._sync_lock_users[repo_id]
+                del self._sync_locks[repo_id]
+            self._prune_last_sync()
+
+    def _prune_last_sync(self):
+        # Forget repos outside their cooldown, so only recent syncs are tracked
+        now = time.monotonic()
+        for repo_id, last_sync in list(self._last_sync.items()):
+            if now - last_sync >= self.SYNC_COOLDOWN:
+                del self._last_sync[repo_id]
+
+    async def _sync_prs(self, owner: str, repo_name: str, user: User, repo_id: PydanticObjectId) -> bool:
         try:
             gh_prs = await github_service.fetch_prs(owner, repo_name, user)
-            for item in gh_prs:
-                num = item["number"]
-                
-                # Fetch or Create
-                pr = await PullRequest.find_one(PullRequest.repo_id == repo_id, PullRequest.pr_number == num)
-                if not pr:
-                    pr = PullRequest(
-                        repo_id=repo_id,
-                        pr_number=num,
-                        title=item["title"],
-                        author=item["user"]["login"],
-                        created_at=datetime.strptime(item["created_at"], "%Y-%m-%dT%H:%M:%SZ"),
-                        github_url=item["html_url"],
-                        validation_status="pending"
-                    )
-                else:
+            await self.upsert_prs(repo_id, gh_prs)
+            return True
+        except Exception:
+            logger.exception("Background PR sync error repo=%s/%s", owner, repo_name)
+            return False
+
+    async def upsert_prs(self, repo_id: PydanticObjectId, gh_prs: List[dict]) -> int:
+        """
+        Create or refresh PRs from a GitHub listing: one upsert per PR, all
+        sent in a single bulk write, so existing PRs are never read back.
+        Returns the number of newly created PRs.
+        """
+        if not gh_prs:
+            return 0
+        
+        # What's stored now, so unchanged PRs are left out of the write
+        stored = {
+            pr.pr_number: (pr.title, pr.body)
+            for pr in await PullRequest.find(
+                {"repo_id": repo_id, "pr_number": {"$in": [item["number"] for item in gh_prs]}},
+                projection_model=PRSyncView
+            ).to_list()
+        }
+        
+        now = datetime.utcnow()
+        operations = []
+        for item in gh_prs:
+            body = item.get("body") or ""
+            if stored.get(item["number"]) == (item["title"], body):
+                continue
+            
+            # Full document for PRs not seen before (model defaults included)
+            new_pr = PullRequest(
+                repo_id=repo_id,
+                pr_number=item["number"],
+                title=item["title"],
+                author=item["user"]["login"],
+                created_at=_parse_gh_ts(item["created_at"]),
+                github_url=item["html_url"],
+                body=body,
+                validation_status="pending"
+            )
+            operations.append(UpdateOne(
+                {"repo_id": repo_id, "pr_number": item["number"]},
+                {
                     # Update basics
-                    pr.title = item["title"]
-                    pr.updated_at = datetime.utcnow()
-                
-                await pr.save()
-        except Exception as e:
-            print(f"Background PR Sync Error: {e}")
-
-    async def get_or_sync_pr(self, owner: str, repo_name: str, pr_number: int, user: User) -> Optional[PullRequest]:
-        repo = await Repo.find_one(Repo.owner == owner, Repo.name == repo_name)
-        if not repo: return None
+                    "$set": {"title": item["title"], "body": new_pr.body, "updated_at": now},
+                    "$setOnInsert": new_pr.model_dump(exclude={"id", "revision_id", "title", "body", "updated_at"})
+                },
+                upsert=True
+            ))
+        
+        if not operations:
+            return 0
+        result = await PullRequest.get_motor_collection().bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    async def get_or_sync_pr(
+        self, owner: str, repo_name: str, pr_number: int, user: User,
+        repo_id: Optional[PydanticObjectId] = None
+    ) -> Optional[PullRequest]:
+        # Callers that already resolved the repo pass its id
+        if repo_id is None:
+            repo_id = await issue_service.lookup_repo_id(owner, repo_name)
+        if not repo_id: return None
         
-        pr = await PullRequest.find_one(PullRequest.repo_id == repo.id, PullRequest.pr_number == pr_number)
+        pr = await PullRequest.find_one(PullRequest.repo_id == repo_id, PullRequest.pr_number == pr_number)
         if not pr:
             gh_data = await github_service.fetch_pr(owner, repo_name, pr_number, user)
             if not gh_data: return None
             
             pr = PullRequest(
-                repo_id=repo.id,
+                repo_id=repo_id,
                 pr_number=pr_number,
                 title=gh_data["title"],
                 author=gh_data["user"]["login"],
-                created_at=datetime.strptime(gh_data["created_at"], "%Y-%m-%dT%H:%M:%SZ"),
+                created_at=_parse_gh_ts(gh_data["created_at"]),
                 github_url=gh_data["html_url"],
+                body=gh_data.get("body") or "",
                 validation_status="pending"
             )
             await pr.save()
@@ -94,19 +193,26 @@ class PRService:
 
     async def run_review(self, owner: str, repo_name: str, issue_number: int, pr_number: int, user: User):
         # 1. Fetch Data
-        repo = await Repo.find_one(Repo.owner == owner, Repo.name == repo_name)
-        if not repo: return None
+        repo_id = await issue_service.lookup_repo_id(owner, repo_name)
+        if not repo_id: return None
         
-        issue = await Issue.find_one(Issue.repo_id == repo.id, Issue.issue_number == issue_number)
-        pr_doc = await self.get_or_sync_pr(owner, repo_name, pr_number, user)
+        # Issue, PR and diff are independent: Mongo and GitHub round-trips overlap
+        issue, pr_doc, diff = await asyncio.gather(
+            Issue.find_one(Issue.repo_id == repo_id, Issue.issue_number == issue_number),
+            self.get_or_sync_pr(owner, repo_name, pr_number, user, repo_id=repo_id),
+            github_service.fetch_pr_diff(
+                owner, repo_name, pr_number, user, max_chars=assistant.MAX_DIFF_CHARS
+            ),
+            return_exceptions=True
+        )
+        for result in (issue, pr_doc):
+            if isinstance(result, BaseException): raise result
         if not issue or not pr_doc: return None
+        # Diff errors only matter once the PR is known to exist
+        if isinstance(diff, BaseException): raise diff
         
-        # 2. Get Diff & Body via Service
-        diff = await github_service.fetch_pr_diff(owner, repo_name, pr_number, user)
-        # Hack: Get body from PR (we should store it, but for now fetch again or use existing if fresh)
-        # Just fetch fresh PR data to be safe on body
-        pr_data = await github_service.fetch_pr(owner, repo_name, pr_number, user)
-        description = pr_data.get("body", "")
+        # 2. Get Body via Service
+        description = await self.get_pr_body(owner, repo_name, pr_doc, user)
         
         # 3. Prepare Checklist
         checklist_items = [{"id": i.id, "text": i.text} for i in issue.checklist]
@@ -121,19 +227,18 @@ class PRService:
         pr_doc.summary = r.get("summary", "")
         
         manifest_items = []
-        validated_lookup = {item.get("id"): item for item in r.get("checklist_items", []) if item.get("id")}
+        validated_lookup = index_checklist_results(r.get("checklist_items", []))
         
         for item in issue.checklist:
-             res = validated_lookup.get(item.id)
              # Default to pending if AI didn't return it
-             status = res["status"] if res and "status" in res else "pending"
+             status, evidence, reasoning = validated_lookup.get(item.id, UNVALIDATED)
              manifest_items.append({
                  "id": item.id,
                  "text": item.text,
                  "required": item.required,
-                 "status": res["status"] if res else "pending",
-                 "evidence": res.get("evidence") if res else None,
-                 "reasoning": res.get("reasoning") if res else None,
+                 "status": status,
+                 "evidence": evidence,
+                 "reasoning": reasoning,
                  "linked_tests": []
              })
              
@@ -141,34 +246,45 @@ class PRService:
         all_passed = all(i["status"] == "passed" for i in manifest_items)
         pr_doc.validation_status = "validated" if all_passed and manifest_items else "needs_work"
         pr_doc.updated_at = datetime.utcnow()
-        await pr_doc.save()
         
         # 6. Update Issue History
         self._update_issue_history(issue, pr_number, validated_lookup)
-        await issue.save()
+        # Separate documents: both writes in flight at once
+        await asyncio.gather(pr_doc.save(), issue.save())
         
         return pr_doc
 
+    async def get_pr_body(self, owner: str, repo_name: str, pr: PullRequest, user: User) -> str:
+        """PR description stored at sync time, fetched only for PRs synced before it was kept."""
+        if pr.body is None:
+            pr_data = await github_service.fetch_pr(owner, repo_name, pr.pr_number, user)
+            # Kept on the document, persisted by the caller's next save
+            pr.body = pr_data.get("body") or ""
+        return pr.body
+
     def _update_issue_history(self, issue: Issue, pr_number: int, result_map: dict):
         summary_updated = False
         for item in issue.checklist:
             res = result_map.get(item.id)
             if res:
+                status, evidence, reasoning = res
                 val = ValidationResult(
                     pr_number=pr_number,
-                    status=res["status"],
-                    evidence=res.get("evidence"),
-                    reasoning=res.get("reasoning")
+                    status=status,
+                    evidence=evidence,
+                    reasoning=reasoning
                 )
                 item.latest_validation = val
                 item.validations.append(val)
-                item.status = res["status"]
+                item.status = status
                 summary_updated = True
         
         if summary_updated:
+            # One pass over the checklist for all three counts
+            status_counts = Counter(i.status for i in issue.checklist)
             issue.checklist_summary.total = len(issue.checklist)
-            issue.checklist_summary.passed = sum(1 for i in issue.checklist if i.status == 'passed')
-            issue.checklist_summary.failed = sum(1 for i in issue.checklist if i.status == 'failed')
-            issue.checklist_summary.pending = sum(1 for i in issue.checklist if i.status == 'pending')
+            issue.checklist_summary.passed = status_counts['passed']
+            issue.checklist_summary.failed = status_counts['failed']
+            issue.checklist_summary.pending = status_counts['pending']
 
 pr_service = PRService()
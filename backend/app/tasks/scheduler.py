@@ -1,3 +1,6 @@
+import asyncio
+import re
+from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from app.models.pr import PullRequest
 from app.models.repo import Repo
@@ -5,12 +8,19 @@ from app.models.user import User
 from app.models.issue import Issue
 from app.services.assistant_service import assistant
 from app.services.github import github_service
-from app.services.pr_service import pr_service
+from app.services.pr_service import UNVALIDATED, index_checklist_results, pr_service
 from app.services.issue_service import issue_service
-from fastapi import BackgroundTasks
 
 scheduler = AsyncIOScheduler()
 
+# "fixes #12"-style references from a PR body to the issues it closes
+LINKED_ISSUE_RE = re.compile(
+    r"(?:close|closes|closed|fix|fixes|fixed|resolve|resolves|resolved)\s+#(\d+)", re.IGNORECASE
+)
+
+# Pending PRs validated at once by job_validate_pending_prs
+VALIDATION_CONCURRENCY = 5
+
 async def job_sync_github_data():
     """
     Periodically syncs all installed repos.
@@ -23,144 +33,200 @@ async def job_sync_github_data():
             user = await User.find_one(User.login == repo.owner)
             if not user or not user.access_token:
                 user = await User.find_one(User.access_token != None)
-            
-            if not user:
-                print(f"Skipping sync for {repo.name}: No valid user token found.")
-                continue
-
-            # Sync Issues
-            # Note: issue_service.list_issues fetches and converts, but doesn't bulk save.
-            # We strictly want to 'upsert' recent items.
-            gh_issues = await github_service.fetch_issues(repo.owner, repo.name, user)
-            for item in gh_issues:
-                if "pull_request" in item: continue
-                # Trigger get_or_sync logic which saves to DB
-                await issue_service.get_or_sync_issue(repo.owner, repo.name, item["number"], user, BackgroundTasks())
-            
-            # Sync PRs
-            gh_prs = await github_service.fetch_prs(repo.owner, repo.name, user)
-            for item in gh_prs:
-                await pr_service.get_or_sync_pr(repo.owner, repo.name, item["number"], user)
-                
-            print(f"Synced {repo.name} success.")
-            
         except Exception as e:
             print(f"Failed to sync {repo.name}: {e}")
+            continue
+        
+        if not user:
+            print(f"Skipping sync for {repo.name}: No valid user token found.")
+            continue
+        
+        # Listings come back None when GitHub answers 304 (unchanged since the
+        # last poll). The ETag is cached as soon as a listing is fetched, so a
+        # batch that fails to save forgets it; otherwise later polls would get
+        # 304s and never retry that change. Issues and PRs fail independently.
+        
+        # Sync Issues
+        # Note: issue_service.list_issues fetches and converts, but doesn't bulk save.
+        # We strictly want to 'upsert' recent items.
+        synced = True
+        gh_issues = None
+        try:
+            gh_issues = await github_service.fetch_issues(repo.owner, repo.name, user, only_if_changed=True)
+            if gh_issues is not None:
+                issue_numbers = [item["number"] for item in gh_issues if "pull_request" not in item]
+                # Trigger get_or_sync logic for the whole page in one batch
+                await issue_service.get_or_sync_issues(repo.owner, repo.name, issue_numbers, user)
+        except Exception as e:
+            if gh_issues is not None:
+                github_service.forget_listing(repo.owner, repo.name, "issues", user)
+            print(f"Failed to sync issues for {repo.name}: {e}")
+            synced = False
+        
+        # Sync PRs
+        gh_prs = None
+        try:
+            gh_prs = await github_service.fetch_prs(repo.owner, repo.name, user, only_if_changed=True)
+            if gh_prs is not None:
+                # Whole page in one bulk upsert
+                await pr_service.upsert_prs(repo.id, gh_prs)
+        except Exception as e:
+            if gh_prs is not None:
+                github_service.forget_listing(repo.owner, repo.name, "pulls", user)
+            print(f"Failed to sync PRs for {repo.name}: {e}")
+            synced = False
+        
+        if synced:
+            print(f"Synced {repo.name} success.")
 
 async def job_validate_pending_prs():
     print("Checking for pending PR validations...")
     pending_prs = await PullRequest.find(PullRequest.validation_status == "pending").to_list()
+    if not pending_prs:
+        return
+    
+    # Repos and their token users are resolved once per sweep, not per PR
+    repo_ids = list({pr.repo_id for pr in pending_prs})
+    repos = {repo.id: repo for repo in await Repo.find({"_id": {"$in": repo_ids}}).to_list()}
+    owners = list({repo.owner for repo in repos.values()})
+    users = {
+        user.login: user
+        for user in await User.find({"login": {"$in": owners}}).to_list()
+        if user.access_token
+    }
+    if any(owner not in users for owner in owners):
+        # Any user with a token, for repos whose owner has none
+        fallback_user = await User.find_one(User.access_token != None)
+        for owner in owners:
+            users.setdefault(owner, fallback_user)
     
-    for pr in pending_prs:
+    # PRs are independent (each is saved on its own), so several are
+    # validated at once; the semaphore bounds concurrent AI/GitHub calls
+    semaphore = asyncio.Semaphore(VALIDATION_CONCURRENCY)
+    
+    async def validate(pr: PullRequest):
+        async with semaphore:
+            repo = repos.get(pr.repo_id)
+            await _validate_pending_pr(pr, repo, users.get(repo.owner) if repo else None)
+    
+    await asyncio.gather(*(validate(pr) for pr in pending_prs))
+
+async def _validate_pending_pr(pr: PullRequest, repo: Optional[Repo], user: Optional[User]):
+    try:
+        if not repo: 
+            print(f"PR #{pr.pr_number}: Repo not found, skipping")
+            return
+        
+        # 1. User Resolution - the owner's token, else any user's (resolved per sweep by the caller)
+        # If no valid user/token, skip this PR and mark for manual review
+        if not user or not user.access_token:
+            print(f"PR #{pr.pr_number} ({repo.owner}/{repo.name}): No valid GitHub token found, marking as needs_manual_review")
+            pr.validation_status = "needs_manual_review"
+            pr.summary = "Validation could not be performed due to missing GitHub access token. Please review manually."
+            await pr.save()
+            return
+        
+        # 2. Fetch Data via Service (handling decryption)
         try:
-            repo = await Repo.get(pr.repo_id)
-            if not repo: 
-                print(f"PR #{pr.pr_number}: Repo not found, skipping")
-                continue
-            
-            # 1. User Resolution - Find user with valid token
-            user = await User.find_one(User.login == repo.owner)
-            if not user or not user.access_token:
-                 user = await User.find_one(User.access_token != None)
-            
-            # If still no valid user/token, skip this PR and mark for manual review
-            if not user or not user.access_token:
-                print(f"PR #{pr.pr_number} ({repo.owner}/{repo.name}): No valid GitHub token found, marking as needs_manual_review")
+            diff_text, body = await asyncio.gather(
+                github_service.fetch_pr_diff(
+                    repo.owner, repo.name, pr.pr_number, user, max_chars=assistant.MAX_DIFF_CHARS
+                ),
+                pr_service.get_pr_body(repo.owner, repo.name, pr, user)
+            )
+        except Exception as e:
+            # If GitHub API call fails (401, 403, etc.), mark for manual review
+            if "401" in str(e) or "Unauthorized" in str(e):
+                print(f"PR #{pr.pr_number}: GitHub authentication failed, marking as needs_manual_review")
                 pr.validation_status = "needs_manual_review"
-                pr.summary = "Validation could not be performed due to missing GitHub access token. Please review manually."
+                pr.summary = "GitHub API authentication failed. Token may be expired or invalid."
                 await pr.save()
-                continue
-            
-            # 2. Fetch Data via Service (handling decryption)
-            try:
-                diff_text = await github_service.fetch_pr_diff(repo.owner, repo.name, pr.pr_number, user)
-                pr_data = await github_service.fetch_pr(repo.owner, repo.name, pr.pr_number, user)
-            except Exception as e:
-                # If GitHub API call fails (401, 403, etc.), mark for manual review
-                if "401" in str(e) or "Unauthorized" in str(e):
-                    print(f"PR #{pr.pr_number}: GitHub authentication failed, marking as needs_manual_review")
-                    pr.validation_status = "needs_manual_review"
-                    pr.summary = "GitHub API authentication failed. Token may be expired or invalid."
-                    await pr.save()
-                    continue
-                else:
-                    # Other errors, re-raise to be caught by outer try/except
-                    raise
-            
-            body = pr_data.get("body", "")
-            
-            # 3. Find Linked Issues
-            # (Logic remains same, can be moved to service but fine here for now)
-            import re
-            linked_issues = []
-            if body:
-                issue_numbers = re.findall(r"(?:close|closes|closed|fix|fixes|fixed|resolve|resolves|resolved)\s+#(\d+)", body, re.IGNORECASE)
-                for num in issue_numbers:
-                    issue = await Issue.find_one(Issue.repo_id == repo.id, Issue.issue_number == int(num))
-                    if issue: linked_issues.append(issue)
+                return
+            else:
+                # Other errors, re-raise to be caught by outer try/except
+                raise
+        
+        # 3. Find Linked Issues
+        # (Logic remains same, can be moved to service but fine here for now)
+        linked_issues = []
+        if body:
+            issue_numbers = LINKED_ISSUE_RE.findall(body)
+            # One $in query for all referenced issues, kept in reference order
+            wanted = list(dict.fromkeys(int(num) for num in issue_numbers))
+            if wanted:
+                found = await Issue.find({"repo_id": repo.id, "issue_number": {"$in": wanted}}).to_list()
+                by_number = {issue.issue_number: issue for issue in found}
+                linked_issues = [by_number[num] for num in wanted if num in by_number]
 
-            checklist_definitions = []
-            for issue in linked_issues:
-                if issue.checklist:
-                    for item in issue.checklist:
-                        checklist_definitions.append({"id": item.id, "text": item.text})
-            
-            # 4. Agentic Review
-            if not checklist_definitions:
-                print(f"PR #{pr.pr_number} has no linked checklist. Skipping review.")
-                # Mark as 'skipped' or 'needs_manual_review'? 
-                # For now leave pending or set to 'no_checklist'
-                continue
+        checklist_definitions = []
+        for issue in linked_issues:
+            if issue.checklist:
+                for item in issue.checklist:
+                    checklist_definitions.append({"id": item.id, "text": item.text})
+        
+        # 4. Agentic Review
+        if not checklist_definitions:
+            print(f"PR #{pr.pr_number} has no linked checklist. Skipping review.")
+            # Mark as 'skipped' or 'needs_manual_review'? 
+            # For now leave pending or set to 'no_checklist'
+            return
 
-            review_result = await assistant.verify_change(pr.title, body, diff_text, checklist_definitions)
-            
-            # 5. Persist (Code Logic Duplicated from pr_service.run_review - should ideally reuse)
-            # For simplicity, we manually update here or call `pr_service` methods if we refactor `run_review` to take data.
-            # Let's manually update to match older logic but clean.
-            
-            pr.summary = review_result.get("summary")
-            pr.health_score = review_result.get("health_score")
-            pr.code_health = review_result.get("code_health", [])
-            pr.suggested_tests = review_result.get("suggested_tests", [])
-            
-            manifest_items = []
-            validated_lookup = {item["id"]: item for item in review_result.get("checklist_items", [])}
-            
-            for item in checklist_definitions:
-                res = validated_lookup.get(item["id"])
-                manifest_items.append({
-                    "id": item["id"],
-                    "text": item["text"],
-                    "required": True,
-                    "status": res["status"] if res else "pending",
-                    "evidence": res.get("evidence"),
-                    "reasoning": res.get("reasoning"),
-                    "linked_tests": []
-                })
-            
-            pr.manifest = {"checklist_items": manifest_items}
-            all_passed = all(i["status"] == "passed" for i in manifest_items)
-            pr.validation_status = "validated" if all_passed and manifest_items else "needs_work"
-            
-            await pr.save()
-            
-            # Update Issues
-            if linked_issues:
-                # Reuse the logic from pr_service if possible, but it's private `_update_issue_history`
-                # We'll just duplicate the simple loop for now
-                for issue in linked_issues:
-                    updated = False
-                    for item in issue.checklist:
-                        res = validated_lookup.get(item.id)
-                        if res:
-                            item.status = res["status"]
-                            updated = True
-                    if updated: await issue.save()
+        review_result = await assistant.verify_change(pr.title, body, diff_text, checklist_definitions)
+        
+        # 5. Persist (Code Logic Duplicated from pr_service.run_review - should ideally reuse)
+        # For simplicity, we manually update here or call `pr_service` methods if we refactor `run_review` to take data.
+        # Let's manually update to match older logic but clean.
+        
+        pr.summary = review_result.get("summary")
+        pr.health_score = review_result.get("health_score")
+        pr.code_health = review_result.get("code_health", [])
+        pr.suggested_tests = review_result.get("suggested_tests", [])
+        
+        manifest_items = []
+        validated_lookup = index_checklist_results(review_result.get("checklist_items", []))
+        
+        for item in checklist_definitions:
+            status, evidence, reasoning = validated_lookup.get(item["id"], UNVALIDATED)
+            manifest_items.append({
+                "id": item["id"],
+                "text": item["text"],
+                "required": True,
+                "status": status,
+                "evidence": evidence,
+                "reasoning": reasoning,
+                "linked_tests": []
+            })
+        
+        pr.manifest = {"checklist_items": manifest_items}
+        all_passed = all(i["status"] == "passed" for i in manifest_items)
+        pr.validation_status = "validated" if all_passed and manifest_items else "needs_work"
+        
+        # Update Issues
+        # Reuse the logic from pr_service if possible, but it's private `_update_issue_history`
+        # We'll just duplicate the simple loop for now
+        issue_updates = []
+        for issue in linked_issues:
+            statuses = {
+                item.id: validated_lookup[item.id][0]
+                for item in issue.checklist if item.id in validated_lookup
+            }
+            if statuses:
+                # Per-item $set rather than issue.save(): PRs validated
+                # concurrently can link the same issue, and saving a whole
+                # stale copy would drop the other PR's status updates
+                issue_updates.append(Issue.get_motor_collection().update_one(
+                    {"_id": issue.id},
+                    {"$set": {f"checklist.$[i{n}].status": status for n, status in enumerate(statuses.values())}},
+                    array_filters=[{f"i{n}.id": item_id} for n, item_id in enumerate(statuses)]
+                ))
+        
+        # The PR and its issues are separate documents: write them all at once
+        await asyncio.gather(pr.save(), *issue_updates)
 
-            print(f"Validated PR #{pr.pr_number}")
-            
-        except Exception as e:
-            print(f"Validation failed for PR #{pr.pr_number}: {e}")
+        print(f"Validated PR #{pr.pr_number}")
+        
+    except Exception as e:
+        print(f"Validation failed for PR #{pr.pr_number}: {e}")
 
 def start_scheduler():
     scheduler.add_job(job_sync_github_data, 'interval', minutes=60)
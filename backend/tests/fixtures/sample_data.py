@@ -2,29 +2,69 @@
 Test fixtures for V1 regression tests.
 Synthetic data to ensure deterministic testing without API calls.
 """
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from app.models.scan import RiskItem
+
+
+@lru_cache(maxsize=None)
+def make_item(severity: str, title: str = "Issue") -> RiskItem:
+    """
+    RiskItem with filler fields; only severity matters to calculate_score.
+    Cached, so each (severity, title) is validated once and shared read-only.
+    """
+    return RiskItem(
+        title=title,
+        why_it_matters="Test",
+        affected_areas=["test.py"],
+        likelihood="medium",
+        recommended_action="Fix",
+        severity=severity
+    )
+
+
+# Title keywords the RiskEngine tests filter findings by
+FINDING_KEYWORDS = ("Hotspot", "Deep", "Large File", "Complex Module", "Complex")
+
+
+def by_title_kw(findings, keywords=FINDING_KEYWORDS) -> defaultdict:
+    """Findings grouped by each keyword found in their title, in a single pass"""
+    groups = defaultdict(list)
+    for f in findings:
+        for kw in keywords:
+            if kw in f.title:
+                groups[kw].append(f)
+    return groups
+
+
+def _frozen_metrics(*files: dict) -> tuple:
+    """Read-only file metrics, so no test can mutate data another test shares"""
+    return tuple(MappingProxyType(f) for f in files)
+
 
 # Sample file metrics for testing RiskEngine
-SAMPLE_METRICS_CLEAN = [
+SAMPLE_METRICS_CLEAN = _frozen_metrics(
     {"path": "utils.py", "complexity": 10, "loc": 50, "indent_depth": 2, "size": 1200},
     {"path": "helpers.py", "complexity": 8, "loc": 80, "indent_depth": 3, "size": 2000}
-]
+)
 
-SAMPLE_METRICS_WITH_HOTSPOT = [
+SAMPLE_METRICS_WITH_HOTSPOT = _frozen_metrics(
     {"path": "auth.py", "complexity": 45, "loc": 200, "indent_depth": 4, "size": 5000},
     {"path": "utils.py", "complexity": 10, "loc": 50, "indent_depth": 2, "size": 1200}
-]
+)
 
-SAMPLE_METRICS_DEEP_NESTING = [
+SAMPLE_METRICS_DEEP_NESTING = _frozen_metrics(
     {"path": "nested.py", "complexity": 20, "loc": 150, "indent_depth": 8, "size": 3000}
-]
+)
 
-SAMPLE_METRICS_LARGE_FILE = [
+SAMPLE_METRICS_LARGE_FILE = _frozen_metrics(
     {"path": "models.py", "complexity": 15, "loc": 350, "indent_depth": 3, "size": 8000}
-]
+)
 
-SAMPLE_METRICS_COMPLEX = [
+SAMPLE_METRICS_COMPLEX = _frozen_metrics(
     {"path": "engine.py", "complexity": 40, "loc": 250, "indent_depth": 5, "size": 6000}
-]
+)
 
 # Sample churn data
 CHURN_LOW = {
@@ -69,3 +109,22 @@ EXPECTED_COMPLEX_FINDING = {
     "why_it_matters_contains": "complexity",
     "recommended_action_contains": "Simplification"
 }
+
+# GitHub issues API item for service tests
+GITHUB_ISSUE_STUB = {
+    "number": 1,
+    "title": "Test Issue",
+    "created_at": "2023-01-01T00:00:00Z",
+    "updated_at": "2023-01-01T00:00:00Z",
+    "html_url": "http://github.com/o/r/issues/1"
+}
+
+# GitHub pulls API item for service tests
+GITHUB_PR_STUB = {
+    "number": 1,
+    "title": "Test PR",
+    "body": "Fixes #1",
+    "user": {"login": "octocat"},
+    "created_at": "2023-01-02T00:00:00Z",
+    "html_url": "http://github.com/o/r/pull/1"
+}
@@ -1,15 +1,74 @@
-import pytest
-from httpx import AsyncClient
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+from httpx import AsyncClient, Response
+from app.api.v1.endpoints.me import get_current_user
+from app.main import api, app, lifespan
+from app.models.issue import Issue
+from app.models.repo import Repo
+from app.models.scan import ScanResult
+from app.models.user import User
+from app.services.audit.scanner import audit_scanner
+from app.services.github import github_service
+from tests.fixtures.sample_data import GITHUB_ISSUE_STUB
 
-@pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
     # Depending on if we have a root endpoint, strictly we have app mount at /api/v1
     # Often docs are at /api/v1/docs
     resp = await client.get("/api/docs")
     assert resp.status_code == 200
 
-@pytest.mark.asyncio
 async def test_auth_redirect(client: AsyncClient):
     resp = await client.get("/api/auth/github/login", follow_redirects=False)
     assert resp.status_code == 307
     assert "github.com/login/oauth" in resp.headers["location"]
+
+async def test_lifespan_fails_interrupted_scans(mongo_client):
+    # ASGITransport never runs the lifespan, so startup/shutdown is driven here
+    stale = await ScanResult(
+        repo_id=PydanticObjectId(), status="processing",
+        started_at=datetime.utcnow() - audit_scanner.STALE_SCAN_AGE - timedelta(minutes=1)
+    ).insert()
+    recent = await ScanResult(repo_id=PydanticObjectId(), status="processing").insert()
+
+    with patch("app.core.database.AsyncIOMotorClient", return_value=mongo_client):
+        async with lifespan(app):
+            pass
+
+    stale = await ScanResult.get(stale.id)
+    assert stale.status == "failed"
+    assert stale.completed_at is not None
+    assert (await ScanResult.get(recent.id)).status == "processing"
+
+async def test_sync_issues_upserts_new_issues_only(client: AsyncClient, monkeypatch):
+    repo = await Repo(repo_full_name="sync-owner/sync-repo", owner="sync-owner", name="sync-repo").insert()
+    gh_issues = [
+        {**GITHUB_ISSUE_STUB, "state": "open", "body": "Steps to reproduce"},
+        {**GITHUB_ISSUE_STUB, "number": 2, "state": "closed"},
+        {**GITHUB_ISSUE_STUB, "number": 3, "pull_request": {}}
+    ]
+    gh_client = MagicMock(is_closed=False)
+    gh_client.get = AsyncMock(return_value=Response(200, json=gh_issues))
+    monkeypatch.setattr(github_service, "_client", gh_client)
+    monkeypatch.setattr("app.core.security.decrypt_token", lambda token: "token")
+    monkeypatch.setitem(
+        api.dependency_overrides, get_current_user,
+        lambda: User(login="test", access_token="encrypted", managed_repos=[])
+    )
+    
+    url = "/api/repos/sync-owner/sync-repo/issues/sync"
+    resp = await client.post(url)
+    assert resp.status_code == 200
+    assert resp.json()["synced"] == 2
+    
+    issue = await Issue.find_one(Issue.repo_id == repo.id, Issue.issue_number == 1)
+    assert issue.description == "Steps to reproduce"
+    assert issue.checklist == []
+    closed = await Issue.find_one(Issue.repo_id == repo.id, Issue.issue_number == 2)
+    assert closed.status == "completed"
+    assert closed.github_state == "closed"
+    
+    # A second sync refreshes the same issues instead of inserting them again
+    resp = await client.post(url)
+    assert resp.json()["synced"] == 0
+    assert await Issue.find(Issue.repo_id == repo.id).count() == 2
@@ -0,0 +1,23 @@
+"""
+Tests for the repository walk shared by the V2 scanner and the V3 audit
+"""
+from app.services.audit.file_walker import walk_files
+
+
+def test_walk_files_prunes_and_flags_test_dirs(tmp_path):
+    for rel_path in ("src/app.py", "src/util.ts", "tests/test_app.py",
+                     "node_modules/lib/index.js", ".git/HEAD", "README.md"):
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+    (tmp_path / "linked").symlink_to(tmp_path / "src", target_is_directory=True)
+
+    files = {rel_path: in_test_dir for _, rel_path, in_test_dir in walk_files(tmp_path)}
+
+    # tmp_path itself contains "test": only the path below the root counts
+    assert files == {
+        "README.md": False,
+        "src/app.py": False,
+        "src/util.ts": False,
+        "tests/test_app.py": True,
+    }
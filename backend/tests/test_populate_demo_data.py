@@ -0,0 +1,22 @@
+import importlib.util
+from pathlib import Path
+from unittest.mock import patch
+from app.models.audit import AuditFinding
+from app.models.repo import Repo
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "populate_demo_data.py"
+
+async def test_populate_demo_data_seeds_repos_and_findings(mongo_client):
+    spec = importlib.util.spec_from_file_location("populate_demo_data", SCRIPT)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+
+    # The script runs init_db itself; point it at the session's in-memory client
+    with patch("app.core.database.AsyncIOMotorClient", return_value=mongo_client):
+        await script.populate_data()
+
+    repos = await Repo.find({"owner": "demo"}).to_list()
+    assert sorted(r.repo_full_name for r in repos) == [
+        "demo/backend-service", "demo/data-pipeline", "demo/frontend-app"
+    ]
+    assert await AuditFinding.count() > 0
@@ -0,0 +1,59 @@
+import asyncio
+from beanie import PydanticObjectId
+from app.models.pr import PullRequest
+from app.models.user import User
+from app.services.pr_service import PRService
+from tests.fixtures.sample_data import GITHUB_PR_STUB
+
+async def test_upsert_prs_inserts_with_defaults_then_updates():
+    repo_id = PydanticObjectId()
+    second = {**GITHUB_PR_STUB, "number": 2, "title": "Another PR", "body": None}
+    service = PRService()
+
+    # New PRs are inserted whole, model defaults included
+    assert await service.upsert_prs(repo_id, [GITHUB_PR_STUB, second]) == 2
+    pr = await PullRequest.find_one(PullRequest.repo_id == repo_id, PullRequest.pr_number == 1)
+    assert pr.title == "Test PR"
+    assert pr.author == "octocat"
+    assert pr.validation_status == "pending"
+    assert pr.health_score == 0
+    assert pr.github_state == "open"
+    assert pr.test_results == []
+
+    pr.health_score = 70
+    await pr.save()
+
+    # Known PRs only get their basics refreshed; unchanged ones aren't written
+    edited = {**GITHUB_PR_STUB, "title": "Test PR (edited)"}
+    assert await service.upsert_prs(repo_id, [edited, second]) == 0
+    pr = await PullRequest.find_one(PullRequest.repo_id == repo_id, PullRequest.pr_number == 1)
+    assert pr.title == "Test PR (edited)"
+    assert pr.health_score == 70
+    assert await PullRequest.find(PullRequest.repo_id == repo_id).count() == 2
+
+async def test_sync_prs_bg_serializes_retries_and_drops_idle_state():
+    service = PRService()
+    repo_id = PydanticObjectId()
+    user = User(login="test", access_token="encrypted", managed_repos=[])
+    running = []
+    late_requests = []
+    overlapped = False
+
+    async def failing_sync(*args):
+        nonlocal overlapped
+        overlapped = overlapped or bool(running)
+        running.append(args)
+        await asyncio.sleep(0)
+        running.pop()
+        if not late_requests:
+            # Starts once the lock is released to a queued sync, before that sync runs
+            late_requests.append(asyncio.create_task(service.sync_prs_bg("o", "r", user, repo_id)))
+        return False
+    service._sync_prs = failing_sync
+
+    # Every request retries after a failure, one at a time
+    await asyncio.gather(*(service.sync_prs_bg("o", "r", user, repo_id) for _ in range(3)))
+    await asyncio.gather(*late_requests)
+    assert not overlapped
+    assert service._sync_locks == {}
+    assert service._last_sync == {}
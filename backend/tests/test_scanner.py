@@ -0,0 +1,20 @@
+"""
+Tests for mapping test files to the source modules they cover
+"""
+import pytest
+from app.services.audit.scanner import _test_subject
+
+
+@pytest.mark.parametrize("test_file,subject", [
+    ("tests/test_foo.py", "foo"),
+    ("tests/tests_foo.py", "foo"),
+    ("foo_test.go", "foo"),
+    ("foo_tests.py", "foo"),
+    ("src/foo.spec.ts", "foo"),
+    ("src/foo.test.js", "foo"),
+    ("src/foo_spec.rb", "foo"),
+    ("FooTest.java", "foo"),
+    ("FooTests.java", "foo"),
+])
+def test_test_subject(test_file, subject):
+    assert _test_subject(test_file) == subject
@@ -0,0 +1,47 @@
+from datetime import datetime
+from unittest.mock import AsyncMock
+from beanie import PydanticObjectId
+from app.models.issue import ChecklistItem, Issue, IssueChecklistSummary
+from app.models.pr import PullRequest
+from app.models.repo import Repo
+from app.models.user import User
+from app.tasks.scheduler import _validate_pending_pr
+
+async def test_validate_pending_pr_sets_linked_checklist_statuses(monkeypatch):
+    now = datetime.utcnow()
+    repo = Repo(id=PydanticObjectId(), repo_full_name="o/r", owner="o", name="r")
+    issue = await Issue(
+        repo_id=repo.id, issue_number=4, title="Crash on empty input",
+        created_at=now, updated_at=now, github_url="http://github.com/o/r/issues/4",
+        checklist_summary=IssueChecklistSummary(total=2, passed=0, failed=0, pending=2),
+        checklist=[
+            ChecklistItem(id="a", text="Handle empty input", required=True, status="pending"),
+            ChecklistItem(id="b", text="Add docs", required=True, status="pending")
+        ]
+    ).insert()
+    pr = await PullRequest(
+        repo_id=repo.id, pr_number=9, title="Fix crash", author="octocat",
+        created_at=now, github_url="http://github.com/o/r/pull/9"
+    ).insert()
+
+    monkeypatch.setattr("app.tasks.scheduler.github_service.fetch_pr_diff", AsyncMock(return_value="diff"))
+    monkeypatch.setattr("app.tasks.scheduler.pr_service.get_pr_body", AsyncMock(return_value="Fixes #4"))
+    monkeypatch.setattr("app.tasks.scheduler.assistant.verify_change", AsyncMock(return_value={
+        "summary": "Handles empty input", "health_score": 80,
+        "checklist_items": [{"id": "a", "status": "passed", "evidence": "guard added"}]
+    }))
+    # mongomock has no array_filters, so the issue write itself is only inspected
+    update_one = AsyncMock()
+    monkeypatch.setattr(Issue.get_motor_collection(), "update_one", update_one)
+
+    await _validate_pending_pr(pr, repo, User(login="o", access_token="encrypted", managed_repos=[]))
+
+    update_one.assert_awaited_once_with(
+        {"_id": issue.id},
+        {"$set": {"checklist.$[i0].status": "passed"}},
+        array_filters=[{"i0.id": "a"}]
+    )
+    pr = await PullRequest.get(pr.id)
+    assert pr.validation_status == "needs_work"
+    assert pr.health_score == 80
+    assert [item.status for item in pr.manifest.checklist_items] == ["passed", "pending"]
@@ -6,112 +6,32 @@ These tests serve as a CONTRACT for V1 behavior.
 """
 import pytest
 from app.services.audit.scanner import calculate_score
-from app.models.scan import RiskItem
+from tests.fixtures.sample_data import make_item
 
 
 class TestScoreEngineV1:
     """V1 Regression Tests - Scoring algorithm deterministic behavior"""
     
-    def test_score_perfect_no_findings(self):
-        """No findings → score = 100"""
-        score = calculate_score([])
-        assert score == 100
-    
-    def test_score_deduction_critical(self):
-        """1 critical finding → score = 85 (100 - 15)"""
-        findings = [
-            RiskItem(
-                title="Critical Issue",
-                why_it_matters="Test",
-                affected_areas=["test.py"],
-                likelihood="high",
-                recommended_action="Fix",
-                severity="critical"
-            )
-        ]
-        score = calculate_score(findings)
-        assert score == 85
-    
-    def test_score_deduction_high(self):
-        """1 high finding → score = 90 (100 - 10)"""
-        findings = [
-            RiskItem(
-                title="High Issue",
-                why_it_matters="Test",
-                affected_areas=["test.py"],
-                likelihood="medium",
-                recommended_action="Fix",
-                severity="high"
-            )
-        ]
-        score = calculate_score(findings)
-        assert score == 90
-    
-    def test_score_deduction_medium(self):
-        """1 medium finding → score = 95 (100 - 5)"""
-        findings = [
-            RiskItem(
-                title="Medium Issue",
-                why_it_matters="Test",
-                affected_areas=["test.py"],
-                likelihood="medium",
-                recommended_action="Fix",
-                severity="medium"
-            )
-        ]
-        score = calculate_score(findings)
-        assert score == 95
-    
-    def test_score_deduction_low(self):
-        """1 low finding → score = 98 (100 - 2)"""
-        findings = [
-            RiskItem(
-                title="Low Issue",
-                why_it_matters="Test",
-                affected_areas=["test.py"],
-                likelihood="low",
-                recommended_action="Fix",
-                severity="low"
-            )
-        ]
-        score = calculate_score(findings)
-        assert score == 98
-    
-    def test_score_deduction_mixed(self):
-        """1 critical + 2 high + 1 medium → score = 60 (100 - 15 - 10 - 10 - 5)"""
-        findings = [
-            RiskItem(title="C1", why_it_matters="T", affected_areas=["t"], likelihood="h", recommended_action="F", severity="critical"),
-            RiskItem(title="H1", why_it_matters="T", affected_areas=["t"], likelihood="m", recommended_action="F", severity="high"),
-            RiskItem(title="H2", why_it_matters="T", affected_areas=["t"], likelihood="m", recommended_action="F", severity="high"),
-            RiskItem(title="M1", why_it_matters="T", affected_areas=["t"], likelihood="l", recommended_action="F", severity="medium"),
-        ]
-        score = calculate_score(findings)
-        assert score == 60
-    
-    def test_score_floor_at_zero(self):
-        """10 critical findings → score = 0 (not negative)"""
-        findings = [
-            RiskItem(title=f"C{i}", why_it_matters="T", affected_areas=["t"], likelihood="h", recommended_action="F", severity="critical")
-            for i in range(10)
-        ]
-        score = calculate_score(findings)
-        assert score == 0  # Should be 100 - (10 * 15) = -50, but clamped to 0
-    
-    def test_score_exactly_zero(self):
-        """7 critical findings → score = -5, clamped to 0"""
-        findings = [
-            RiskItem(title=f"C{i}", why_it_matters="T", affected_areas=["t"], likelihood="h", recommended_action="F", severity="critical")
-            for i in range(7)
-        ]
-        score = calculate_score(findings)
-        # 100 - (7 * 15) = 100 - 105 = -5 → clamped to 0
-        assert score == 0
+    @pytest.mark.parametrize("severities,expected", [
+        pytest.param([], 100, id="perfect_no_findings"),
+        pytest.param(["critical"], 85, id="deduction_critical"),  # 100 - 15
+        pytest.param(["high"], 90, id="deduction_high"),  # 100 - 10
+        pytest.param(["medium"], 95, id="deduction_medium"),  # 100 - 5
+        pytest.param(["low"], 98, id="deduction_low"),  # 100 - 2
+        pytest.param(["critical", "high", "high", "medium"], 60, id="deduction_mixed"),  # 100 - 15 - 10 - 10 - 5
+        pytest.param(["critical"] * 10, 0, id="floor_at_zero"),  # 100 - 150 = -50, clamped to 0
+        pytest.param(["critical"] * 7, 0, id="exactly_zero"),  # 100 - 105 = -5, clamped to 0
+    ])
+    def test_score_deductions(self, severities, expected):
+        """Per-severity deductions from 100, clamped at 0"""
+        findings = [make_item(severity) for severity in severities]
+        assert calculate_score(findings) == expected
     
     def test_determinism_same_findings_same_score(self):
         """V1 DETERMINISM: Same findings run 10x → identical score"""
         findings = [
-            RiskItem(title="C", why_it_matters="T", affected_areas=["t"], likelihood="h", recommended_action="F", severity="critical"),
-            RiskItem(title="H", why_it_matters="T", affected_areas=["t"], likelihood="m", recommended_action="F", severity="high"),
+            make_item("critical", title="C"),
+            make_item("high", title="H"),
         ]
         
         # Run 10 times
@@ -124,15 +44,15 @@ class TestScoreEngineV1:
     def test_score_order_independence(self):
         """Score should be same regardless of finding order"""
         findings_order1 = [
-            RiskItem(title="C", why_it_matters="T", affected_areas=["t"], likelihood="h", recommended_action="F", severity="critical"),
-            RiskItem(title="H", why_it_matters="T", affected_areas=["t"], likelihood="m", recommended_action="F", severity="high"),
-            RiskItem(title="M", why_it_matters="T", affected_areas=["t"], likelihood="l", recommended_action="F", severity="medium"),
+            make_item("critical", title="C"),
+            make_item("high", title="H"),
+            make_item("medium", title="M"),
         ]
         
         findings_order2 = [
-            RiskItem(title="M", why_it_matters="T", affected_areas=["t"], likelihood="l", recommended_action="F", severity="medium"),
-            RiskItem(title="C", why_it_matters="T", affected_areas=["t"], likelihood="h", recommended_action="F", severity="critical"),
-            RiskItem(title="H", why_it_matters="T", affected_areas=["t"], likelihood="m", recommended_action="F", severity="high"),
+            make_item("medium", title="M"),
+            make_item("critical", title="C"),
+            make_item("high", title="H"),
         ]
         
         score1 = calculate_score(findings_order1)